@@ -0,0 +1,90 @@
+"""
+Benchmark: CatalogIndex vs the original linear scan used by ShopAgent's search_catalog.
+
+Run:
+  python -m benchmarks.catalog_search --skus 1000000
+  python -m benchmarks.catalog_search --file catalog.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from src.agents.tools.search import CatalogIndex
+
+ADJECTIVES = ["plain", "ceramic", "zip", "organic", "vintage", "slim", "classic", "travel", "woven", "thermal"]
+NOUNS = ["t-shirt", "mug", "hoodie", "cap", "sock", "jacket", "bottle", "scarf", "backpack", "notebook"]
+COLOURS = ["black", "white", "navy", "red", "green", "grey", "olive", "sand"]
+
+
+def synthetic_catalog(n: int, seed: int = 7) -> List[dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "sku": f"{rnd.choice(NOUNS)[:4].upper()}-{i:07d}",
+            "name": f"{rnd.choice(COLOURS).title()} {rnd.choice(ADJECTIVES).title()} {rnd.choice(NOUNS).title()} {i}",
+            "price_gbp": round(rnd.uniform(3, 120), 2),
+        }
+        for i in range(n)
+    ]
+
+
+def linear_search(catalog: List[dict], query: str) -> List[dict]:
+    q = query.lower().strip()
+    return [p for p in catalog if q in p["name"].lower() or q in p["sku"].lower()]
+
+
+def linear_details(catalog: List[dict], sku: str) -> dict | None:
+    return next((p for p in catalog if p["sku"] == sku), None)
+
+
+def timed(fn: Callable[[str], object], queries: List[str]) -> List[float]:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28} p50={p50:9.4f} ms  p99={p99:9.4f} ms  n={len(samples)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=200_000, help="synthetic catalog size")
+    parser.add_argument("--file", help="load a .jsonl/.csv catalog instead of generating one")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--linear-queries", type=int, default=10, help="linear scans are slow; sample fewer")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.file:
+        index = CatalogIndex.from_file(args.file)
+        catalog = index.products
+    else:
+        catalog = synthetic_catalog(args.skus)
+        index = CatalogIndex.from_records(catalog)
+    print(f"indexed {len(index):,} products in {time.perf_counter() - start:.1f}s")
+
+    rnd = random.Random(1)
+    skus = [rnd.choice(catalog)["sku"] for _ in range(args.queries)]
+    name_queries = [" ".join(rnd.choice(catalog)["name"].split()[-2:]) for _ in range(args.queries // 2)]
+    name_queries += [" ".join(rnd.choice(catalog)["name"].split()[1:3]) for _ in range(args.queries // 2)]
+
+    report("index.get(sku)", timed(index.get, skus))
+    report("index.search(name, 10)", timed(lambda q: index.search(q, limit=10), name_queries))
+    report("linear details", timed(lambda s: linear_details(catalog, s), skus[:args.linear_queries]))
+    report("linear search", timed(lambda q: linear_search(catalog, q), name_queries[:args.linear_queries]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Deterministic offline stand-ins for ChatOpenAI and OpenAIEmbeddings used by the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import re
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+_ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """cl100k token count when tiktoken's encoding is available (it downloads on first use), else ~4 chars/token."""
+    global _ENCODING
+    if _ENCODING is None:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _ENCODING = False
+    return len(_ENCODING.encode(text)) if _ENCODING else max(1, round(len(text) / 4))
+
+
+def echo_reply(messages: List[BaseMessage]) -> str:
+    return f"Answer based on: {str(messages[-1].content)[:200]}"
+
+
+class DelayedChatModel(BaseChatModel):
+    """
+    Chat model that sleeps a fixed time (latency = ttft + tokens * token_delay) and returns
+    `reply(messages)`. Reports usage_metadata so token accounting code paths are exercised.
+    """
+
+    reply: Callable[[List[BaseMessage]], str] = echo_reply
+    ttft: float = 0.2
+    token_delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed-fake-chat-model"
+
+    def _message(self, messages: List[BaseMessage], text: str) -> AIMessage:
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        output_tokens = len(text.split())
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            response_metadata={"model_name": "fake"},
+        )
+
+    def _generate(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> ChatResult:
+        text = self.reply(messages)
+        time.sleep(self.ttft + self.token_delay * len(text.split()))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        text = self.reply(messages)
+        await asyncio.sleep(self.ttft + self.token_delay * len(text.split()))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, text))])
+
+    def _stream(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        text = self.reply(messages)
+        time.sleep(self.ttft)
+        for i, word in enumerate(text.split(" ")):
+            if i:
+                time.sleep(self.token_delay)
+            token = word if i == 0 else " " + word
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Bag-of-words feature hashing: texts sharing words get similar vectors, so retrieval
+    quality comparisons are meaningful without an embeddings API. Counts calls and texts.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,63 @@
+"""
+Benchmark: sequential vs concurrent Reasoner A/B in the LangGraph reasoning node.
+
+Uses a fake LLM with a fixed per-call latency, so no API key or network is needed.
+
+Run:
+  python -m benchmarks.langgraph_reasoning --latency 0.5 --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")  # lesson modules build ChatOpenAI at import
+
+from benchmarks.fakes import DelayedChatModel
+from src.langgraph import lesson7_loop_aware_supervisor as lesson
+
+
+def sequential(state) -> dict:
+    # The previous implementation: Reasoner A, then Reasoner B.
+    return {**lesson.reasoning_node_a(state), **lesson.reasoning_node_b(state)}
+
+
+def timed(fn, state, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(state)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency per call (seconds)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lesson.llm = DelayedChatModel(ttft=args.latency)
+    state = {
+        "user_query": "Explain how CRISPR gene editing works",
+        "research_notes": "CRISPR is a gene-editing technology.",
+        "retry_count": 0,
+        "max_retries": 2,
+    }
+    retry_state = {**state, "draft_answer_a": "kept", "draft_answer_b": "", "redo_drafts": ["draft_answer_b"]}
+
+    seq = timed(sequential, state, args.runs)
+    par = timed(lesson.reasoning_node, state, args.runs)
+    retry = timed(lesson.reasoning_node, retry_state, args.runs)
+
+    print(f"fake LLM latency: {args.latency:.2f}s per call, median of {args.runs} runs")
+    print(f"sequential A then B      {seq:.3f}s")
+    print(f"concurrent A + B         {par:.3f}s  ({seq / par:.2f}x faster)")
+    print(f"retry, only B redone     {retry:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
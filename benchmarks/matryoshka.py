@@ -0,0 +1,68 @@
+"""
+Benchmark: Matryoshka two-stage search (truncated scan + full-vector re-rank) vs full scan.
+
+Synthetic clustered vectors with a decaying per-dimension energy spectrum mimic embeddings
+trained so the leading dimensions carry most of the signal (text-embedding-3-*). Real
+models should be re-checked with real embeddings; the trend is what this shows.
+
+Run:
+  python -m benchmarks.matryoshka --n 50000 --dim 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
+
+
+def matryoshka_like(n: int, dim: int, rng: np.random.Generator, clusters: int = 500) -> np.ndarray:
+    spectrum = (1.0 + np.arange(dim)) ** -0.25
+    centers = rng.standard_normal((clusters, dim)) * spectrum
+    points = centers[rng.integers(0, clusters, n)] + 0.8 * rng.standard_normal((n, dim)) * spectrum
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = matryoshka_like(args.n, args.dim, rng)
+    queries = vectors[rng.choice(args.n, args.queries, replace=False)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32) * ((1.0 + np.arange(args.dim)) ** -0.25)
+    truth = [set(np.argsort(-(vectors @ q))[: args.k]) for q in queries]
+    texts = [str(i) for i in range(args.n)]
+    # None is the full scan; truncations at or above --dim would just repeat it
+    scan_options = [None] + [d for d in (512, 256, 128, 64) if d < args.dim]
+
+    print(f"{args.n} vectors x {args.dim} dims, recall@{args.k}, shortlist {args.rerank_factor}x k")
+    print(f"{'scan dims':<10} {'RAM MB':>8} {'recall':>7} {'ms/query':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scan_dims in scan_options:
+            store = ArrayVectorStore(
+                embedding=None,
+                scan_dims=scan_dims,
+                rerank_dir=tmp if scan_dims else None,
+                rerank_factor=args.rerank_factor,
+            )
+            store.add_embeddings(texts, vectors, ids=texts)
+            start = time.perf_counter()
+            hits = 0
+            for q, expected in zip(queries, truth):
+                hits += len({int(d.id) for d, _ in store.similarity_search_with_score_by_vector(q, args.k)} & expected)
+            elapsed = (time.perf_counter() - start) / args.queries
+            print(f"{scan_dims or args.dim:<10} {store.nbytes / 2 ** 20:>8.1f} {hits / (args.k * args.queries):>7.3f} {1000 * elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: LLM judge calls with and without the deterministic pre-validation pass.
+
+Runs the lesson 7 graph end to end against a fake LLM whose reasoners return a seeded mix
+of grounded, divergent, off-topic and empty drafts, and counts judge calls.
+
+Run:
+  python -m benchmarks.prevalidation --runs 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")  # lesson modules build ChatOpenAI at import
+
+from benchmarks.fakes import DelayedChatModel
+from src.langgraph import lesson7_loop_aware_supervisor as lesson
+from src.langgraph.prevalidation import PreValidator
+
+NOTES = (
+    "CRISPR is a gene-editing technology adapted from bacterial immune systems. "
+    "The Cas9 enzyme cuts DNA at a location chosen by a guide RNA, and the cell repairs the break."
+)
+DRAFTS = {
+    "grounded": "CRISPR uses the Cas9 enzyme and a guide RNA to cut DNA; the cell repairs the break.",
+    "paraphrase": "Guided by RNA, Cas9 cuts DNA at a chosen location, a technology adapted from bacterial immune systems.",
+    "divergent": "CRISPR edits genes, which raises ethical questions about heritable changes in embryos.",
+    "off_topic": "Photosynthesis converts sunlight into chemical energy inside plant chloroplasts.",
+    "empty": "",
+}
+WEIGHTS = [0.45, 0.2, 0.15, 0.1, 0.1]
+
+
+class Script:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.judge_calls = 0
+
+    def __call__(self, messages) -> str:
+        system = str(messages[0].content)
+        if "research agent" in system:
+            return NOTES
+        if "strict judge" in system:
+            self.judge_calls += 1
+            return "A"
+        return DRAFTS[self.rng.choices(list(DRAFTS), WEIGHTS)[0]]
+
+
+def run(runs: int, seed: int, prevalidate: bool) -> tuple[int, int]:
+    script = Script(seed)
+    lesson.llm = DelayedChatModel(reply=script, ttft=0.0)
+    # An unreachable grounding bar and margin disable every local decision.
+    lesson.PREVALIDATOR = PreValidator() if prevalidate else PreValidator(min_grounding=-1, win_margin=2, agree_similarity=2)
+    app = lesson.build_graph()
+    answered = 0
+    for i in range(runs):
+        state = app.invoke({"user_query": f"Explain CRISPR #{i}", "retry_count": 0, "max_retries": 2})
+        answered += bool(state.get("final_answer"))
+    return script.judge_calls, answered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    lesson.print_state = lambda state: None
+    judge_only, answered_before = run(args.runs, args.seed, prevalidate=False)
+    with_pre, answered_after = run(args.runs, args.seed, prevalidate=True)
+
+    print(f"{args.runs} runs")
+    print(f"judge only          {judge_only:6d} judge calls, {answered_before} answered")
+    print(f"pre-validation      {with_pre:6d} judge calls, {answered_after} answered")
+    print(lesson.PREVALIDATOR.report())
+
+
+if __name__ == "__main__":
+    main()
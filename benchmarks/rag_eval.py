@@ -0,0 +1,304 @@
+"""
+Benchmark: retrieval quality and per-stage latency of the rag_demo pipeline, offline.
+
+Imports src/langchain/rag_demo/main.py (ingest settings, hybrid retriever, semantic cache,
+query log, prompt, parser) with feature-hashing embeddings and a fixed-latency fake chat
+model in place of the OpenAI clients, and runs every question of a JSONL set through its
+`chain`, exactly as the demo answers it:
+
+    {"question": "...", "source": "Identifier+Descriptions.txt", "expected": ["answer phrase", ...]}
+
+A retrieved chunk is relevant when it contains one of the `expected` phrases (whitespace
+normalized), so the set does not depend on chunk boundaries. Reported:
+
+  recall@k   share of expected phrases found in the top-k chunks
+  MRR        1 / rank of the first relevant chunk (0 if none)
+  latency    p50/p95 per stage, from the chain's spans: embed, search, prompt (format +
+             render), llm, parse, and total (the whole chain, cache and query log included)
+  tokens     prompt tokens per model call, answer tokens per question
+  cache      semantic cache hits / lookups
+
+Each pass starts with an empty semantic cache and query log, so only paraphrases within
+the question set are answered from the cache (and then skip prompt, llm and parse).
+Ingest files (rerank vectors, shards) go to a temporary directory that is removed at exit.
+
+--save writes the report as JSON; --baseline compares against a saved report and exits
+with status 1 on a regression (quality down by more than 0.02, latency or tokens up by
+more than --tolerance and at least 1 ms / 1 token).
+
+Run:
+  python -m benchmarks.rag_eval --repeat 5 --save rag_eval.json
+  python -m benchmarks.rag_eval --repeat 5 --baseline rag_eval.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import importlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import langchain_openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.messages import get_buffer_string
+
+from benchmarks.fakes import DelayedChatModel, HashingEmbeddings, count_tokens
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+DATA = Path(__file__).resolve().parent.parent / "src/langchain/rag_demo/data"
+STAGES = ("embed", "search", "prompt", "llm", "parse", "total")
+PROMPT_SPANS = ("format_docs", "ChatPromptTemplate")
+
+
+@dataclass
+class EvalCase:
+    question: str
+    expected: List[str]
+    source: str = ""
+
+
+def read_cases(path: Path) -> List[EvalCase]:
+    cases = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            record = json.loads(line)
+            cases.append(EvalCase(record["question"], list(record["expected"]), record.get("source", "")))
+    return cases
+
+
+def _normalized(text: str) -> str:
+    return " ".join(text.split())
+
+
+def found_phrases(doc: Document, case: EvalCase) -> set:
+    if case.source and not str(doc.metadata.get("source", "")).endswith(case.source):
+        return set()
+    text = _normalized(doc.page_content)
+    return {phrase for phrase in case.expected if _normalized(phrase) in text}
+
+
+class TimedEmbeddings(HashingEmbeddings):
+    """Hashing embeddings with an optional fixed delay per call; query embedding time is recorded."""
+
+    def __init__(self, dimensions: int = 256, delay: float = 0.0):
+        super().__init__(dimensions)
+        self.delay = delay
+        self.query_time = 0.0
+
+    def embed_documents(self, texts):
+        time.sleep(self.delay)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        start = time.perf_counter()
+        vector = super().embed_query(text)
+        self.query_time += time.perf_counter() - start
+        return vector
+
+
+class RunCapture(BaseCallbackHandler):
+    """What the last chain run retrieved and sent to the model (None if it was answered from the cache)."""
+
+    def __init__(self):
+        self.documents: List[Document] = []
+        self.prompt: Optional[str] = None
+
+    def reset(self) -> None:
+        self.documents, self.prompt = [], None
+
+    def on_retriever_end(self, documents, **kwargs):
+        self.documents = list(documents)
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.prompt = get_buffer_string(messages[0])
+
+
+def stage_durations(spans, embed_time: float) -> Dict[str, float]:
+    """Per-stage seconds of one chain run from its spans; stages that did not run are absent."""
+    durations: Dict[str, float] = {}
+    for span in spans:
+        if span.parent_id is None:
+            # The chain's root span; the query_log span inside it is a separate (shorter) trace
+            durations["total"] = max(durations.get("total", 0.0), span.duration)
+            continue
+        if span.kind == "retriever":
+            stage = "search"
+        elif span.kind == "llm":
+            stage = "llm"
+        elif span.name in PROMPT_SPANS:
+            stage = "prompt"
+        elif span.name == "StrOutputParser":
+            stage = "parse"
+        else:
+            continue
+        durations[stage] = durations.get(stage, 0.0) + span.duration
+    if "search" in durations:
+        # The retriever span includes embedding the query (when the dense side ran)
+        durations["embed"] = embed_time
+        durations["search"] -= embed_time
+    return durations
+
+
+@dataclass
+class EvalReport:
+    k: int
+    recall: List[float] = field(default_factory=list)
+    reciprocal_ranks: List[float] = field(default_factory=list)
+    latency: Dict[str, List[float]] = field(default_factory=lambda: {stage: [] for stage in STAGES})
+    prompt_tokens: List[int] = field(default_factory=list)
+    answer_tokens: List[int] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_lookups: int = 0
+
+    def metrics(self) -> Dict[str, float]:
+        metrics = {
+            f"recall@{self.k}": statistics.mean(self.recall),
+            "mrr": statistics.mean(self.reciprocal_ranks),
+            "prompt_tokens": statistics.mean(self.prompt_tokens) if self.prompt_tokens else 0.0,
+            "answer_tokens": statistics.mean(self.answer_tokens),
+        }
+        for stage, samples in self.latency.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            metrics[f"{stage}_p50_ms"] = 1000 * statistics.median(ordered)
+            metrics[f"{stage}_p95_ms"] = 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        return metrics
+
+    def summary(self) -> str:
+        m = self.metrics()
+        lines = [
+            f"recall@{self.k} {m[f'recall@{self.k}']:.3f}   MRR {m['mrr']:.3f}   "
+            f"tokens: prompt {m['prompt_tokens']:.0f}/call, answer {m['answer_tokens']:.0f}   "
+            f"semantic cache: {self.cache_hits} hits / {self.cache_lookups} lookups",
+            f"{'stage':<8} {'n':>5} {'p50 ms':>8} {'p95 ms':>8}",
+        ]
+        for stage in STAGES:
+            if f"{stage}_p50_ms" in m:
+                lines.append(f"{stage:<8} {len(self.latency[stage]):>5} "
+                             f"{m[f'{stage}_p50_ms']:>8.2f} {m[f'{stage}_p95_ms']:>8.2f}")
+        return "\n".join(lines)
+
+
+def regressions(current: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    found = []
+    for name, old in baseline.items():
+        new = current.get(name)
+        if new is None:
+            continue
+        if name.startswith("recall") or name == "mrr":
+            if new < old - 0.02:
+                found.append(f"{name}: {old:.3f} -> {new:.3f}")
+        elif new > old * (1 + tolerance) and new - old >= 1.0:
+            found.append(f"{name}: {old:.2f} -> {new:.2f}")
+    return found
+
+
+def load_pipeline(embeddings: TimedEmbeddings, llm: DelayedChatModel):
+    """Import rag_demo.main (which ingests the corpus) with the fakes in place of the OpenAI clients."""
+    workdir = tempfile.mkdtemp(prefix="rag_eval-")
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    os.environ.update(FULL_VECTORS_DIR=workdir, SHARDS_DIR=str(Path(workdir) / "shards"))
+    ingest = importlib.import_module("src.langchain.rag_demo.ingest")
+    ingest.OpenAIEmbeddings = lambda **_: embeddings
+    # main builds its ChatOpenAI at import time
+    langchain_openai.ChatOpenAI = lambda **_: llm
+    return importlib.import_module("src.langchain.rag_demo.main")
+
+
+def evaluate(main, embeddings: TimedEmbeddings, cases: Sequence[EvalCase], k: int, repeat: int) -> EvalReport:
+    from src.langchain.rag_demo.query_context import QueryLog, SemanticCache
+    from src.observability.spans import SpanCallbackHandler, SpanRecorder
+
+    main.retriever.k = k
+    recorder = main.spans = SpanRecorder()
+    capture = RunCapture()
+    config = {"callbacks": [SpanCallbackHandler(recorder), capture]}
+    report = EvalReport(k=k)
+    for _ in range(repeat):
+        main.cache = SemanticCache(threshold=main.cache.threshold, maxsize=main.cache.maxsize)
+        main.query_log = QueryLog()
+        for case in cases:
+            embeddings.query_time = 0.0
+            recorder.finished.clear()
+            capture.reset()
+            answer = main.chain.invoke(case.question, config=config)
+            for stage, seconds in stage_durations(recorder.finished, embeddings.query_time).items():
+                report.latency[stage].append(seconds)
+
+            docs = capture.documents
+            covered, first_rank = set(), 0
+            for rank, doc in enumerate(docs[:k], start=1):
+                hits = found_phrases(doc, case)
+                if hits and not first_rank:
+                    first_rank = rank
+                covered |= hits
+            report.recall.append(len(covered) / len(case.expected))
+            report.reciprocal_ranks.append(1.0 / first_rank if first_rank else 0.0)
+            if capture.prompt is not None:
+                report.prompt_tokens.append(count_tokens(capture.prompt))
+            report.answer_tokens.append(count_tokens(answer))
+        report.cache_hits += main.cache.hits
+        report.cache_lookups += main.cache.hits + main.cache.misses
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=Path, default=DATA / "eval_questions.jsonl")
+    parser.add_argument("--k", type=int, default=None, help="top-k to evaluate (default: the retriever's k)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--chunker", choices=("recursive", "semantic"), default="recursive")
+    parser.add_argument("--embed-delay", type=float, default=0.0, help="seconds added to every embedding call")
+    parser.add_argument("--llm-ttft", type=float, default=0.05)
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # Fixed here rather than read from .env, so runs are comparable
+    os.environ.update(
+        CHUNK_SIZE=str(args.chunk_size),
+        OVERLAP_SIZE=str(args.overlap),
+        CHUNKER=args.chunker,
+        EMBEDDING_MODEL_NAME="offline-hashing",
+        OPENAI_MODEL="offline-fake",
+        OBSERVABILITY_OTLP_FILE="",
+        OBSERVABILITY_PROMETHEUS_PORT="0",
+    )
+    embeddings = TimedEmbeddings(delay=args.embed_delay)
+    pipeline = load_pipeline(embeddings, DelayedChatModel(ttft=args.llm_ttft))
+    cases = read_cases(args.questions)
+    k = args.k or pipeline.retriever.k
+
+    report = evaluate(pipeline, embeddings, cases, k, args.repeat)
+    print(f"{len(cases)} questions x {args.repeat}, chunker={args.chunker} ({args.chunk_size}/{args.overlap})")
+    print(report.summary())
+
+    metrics = report.metrics()
+    if args.save:
+        args.save.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+    if args.baseline:
+        found = regressions(metrics, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: context tokens per answer, plain top-k vs MMR with span dedup, on the rag_demo corpus.
+
+Uses feature-hashing embeddings, so no API key is needed. "unique" is the share of context
+characters that are not repeated from another retrieved chunk (chunk_overlap duplicates).
+
+Run:
+  python -m benchmarks.rag_mmr --chunk-size 300 --overlap 100 --k 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.fakes import HashingEmbeddings, count_tokens
+from src.langchain.rag_demo.document import format_docs, read_document
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
+
+CORPUS = Path(__file__).resolve().parent.parent / "src/langchain/rag_demo/data/Identifier+Descriptions.txt"
+QUESTIONS = [
+    "What is an ISIN?",
+    "How is the ISIN check digit calculated?",
+    "What does the country code in an ISIN mean?",
+    "What is the national security identifier?",
+    "What is a Bloomberg ticker?",
+    "What is the exchange code in a Bloomberg ticker?",
+    "Which security identifiers are most common?",
+    "What does CRNCY stand for?",
+    "How are bonds identified in Bloomberg?",
+    "What are identifiers used for in structured products?",
+]
+
+
+def unique_share(docs) -> float:
+    spans = sorted((d.metadata["start_index"], d.metadata["start_index"] + len(d.page_content)) for d in docs)
+    covered, end = 0, -1
+    for start, stop in spans:
+        covered += max(0, stop - max(start, end))
+        end = max(end, stop)
+    return covered / max(sum(len(d.page_content) for d in docs), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.overlap, add_start_index=True)
+    chunks = splitter.split_documents([read_document(CORPUS)])
+    embeddings = HashingEmbeddings()
+    store = ArrayVectorStore.from_documents(chunks, embeddings)
+    calls_after_ingest = embeddings.calls
+
+    retrievers = {
+        "top-k": store.as_retriever(search_kwargs={"k": args.k}),
+        "mmr": store.as_retriever(search_type="mmr", search_kwargs={"k": args.k, "fetch_k": args.fetch_k}),
+    }
+    print(f"{len(chunks)} chunks (size {args.chunk_size}, overlap {args.overlap}), k={args.k}, {len(QUESTIONS)} questions")
+    print(f"{'mode':<8} {'tokens/answer':>14} {'unique text':>12}")
+    for name, retriever in retrievers.items():
+        results = [retriever.invoke(q) for q in QUESTIONS]
+        tokens = [count_tokens(format_docs(docs)) for docs in results]
+        unique = [unique_share(docs) for docs in results]
+        print(f"{name:<8} {statistics.mean(tokens):>14.1f} {statistics.mean(unique):>11.0%}")
+    print(f"embedding calls after ingest: {embeddings.calls - calls_after_ingest} (one per query; MMR re-embeds nothing)")
+
+
+if __name__ == "__main__":
+    main()
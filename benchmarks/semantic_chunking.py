@@ -0,0 +1,94 @@
+"""
+Benchmark: fixed-size vs semantic chunking on the rag_demo corpus.
+
+Uses feature-hashing embeddings, so no API key is needed. For each strategy it reports
+the chunks stored, embedding calls and tokens at ingest (the semantic chunker's one
+batched sentence pass included; "+ sentence vectors" stores mean sentence vectors instead
+of embedding the chunks again), and the hit rate: the share of questions whose top-k
+chunks contain the answer phrase in full.
+
+Run:
+  python -m benchmarks.semantic_chunking --k 2 --max-tokens 120
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.fakes import HashingEmbeddings, count_tokens
+from src.langchain.rag_demo.document import read_document
+from src.langchain.rag_demo.semantic_chunker import SemanticChunker
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
+
+CORPUS = Path(__file__).resolve().parent.parent / "src/langchain/rag_demo/data/Identifier+Descriptions.txt"
+# (question, phrase the retrieved context must contain)
+QUESTIONS = [
+    ("What is an ISIN?", "unique 12-character alphanumeric code"),
+    ("How is the ISIN check digit calculated?", "Luhn algorithm"),
+    ("What do the first two characters of an ISIN represent?", "ISO 3166-1 alpha-2 country codes"),
+    ("Who assigns the national security identifier?", "national numbering agency (NNA)"),
+    ("What are Bloomberg ticker symbols?", "unique identifier system used by Bloomberg L.P."),
+    ("What does the exchange code in a Bloomberg ticker indicate?", "indicates where the security is traded"),
+    ("How long is a Bloomberg exchange code?", "one to four characters"),
+    ("What does the base symbol represent?", "issuing company or security name"),
+    ("What ticker might a common stock have?", "AAPL US Equity"),
+    ("Why does the ISIN standard matter for trading?", "clearing, and settlement processes"),
+]
+
+
+class TokenCountingEmbeddings(HashingEmbeddings):
+    def __init__(self, dimensions: int = 256):
+        super().__init__(dimensions)
+        self.tokens = 0
+
+    def embed_documents(self, texts):
+        self.tokens += sum(count_tokens(t) for t in texts)
+        return super().embed_documents(texts)
+
+
+def evaluate(name: str, split, k: int) -> None:
+    """`split(embeddings)` returns chunks, or (chunks, vectors) to store without re-embedding."""
+    embeddings = TokenCountingEmbeddings()
+    result = split(embeddings)
+    if isinstance(result, tuple):
+        chunks, vectors = result
+        store = ArrayVectorStore(embeddings)
+        store.add_embeddings([c.page_content for c in chunks], vectors, [c.metadata for c in chunks])
+    else:
+        chunks = result
+        store = ArrayVectorStore.from_documents(chunks, embeddings)
+    calls, tokens = embeddings.calls, embeddings.tokens
+    hits = 0
+    for question, phrase in QUESTIONS:
+        context = " ".join(" ".join(d.page_content.split()) for d in store.similarity_search(question, k=k))
+        hits += phrase in context
+    mean_tokens = sum(count_tokens(c.page_content) for c in chunks) / max(len(chunks), 1)
+    print(f"{name:<22} {len(chunks):>7} {mean_tokens:>11.0f} {calls:>6} {tokens:>7} {hits / len(QUESTIONS):>9.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=2)
+    parser.add_argument("--max-tokens", type=int, default=120)
+    parser.add_argument("--percentile", type=float, default=75.0)
+    args = parser.parse_args()
+
+    documents = [read_document(CORPUS)]
+    print(f"{len(QUESTIONS)} questions, top-{args.k}; ingest cost includes every embed_documents call")
+    print(f"{'strategy':<22} {'chunks':>7} {'tokens/chunk':>11} {'calls':>6} {'tokens':>7} {'hit rate':>9}")
+    for size, overlap in [(25, 5), (300, 100), (500, 100)]:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap, add_start_index=True)
+        evaluate(f"recursive {size}/{overlap}", lambda _: splitter.split_documents(documents), args.k)
+
+    def chunker(embeddings):
+        return SemanticChunker(embeddings, max_tokens=args.max_tokens, breakpoint_percentile=args.percentile)
+
+    evaluate(f"semantic <= {args.max_tokens} tok", lambda e: chunker(e).split_documents(documents), args.k)
+    evaluate("  + sentence vectors", lambda e: chunker(e).split_documents_with_vectors(documents), args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: query throughput of ShardedVectorStore across shard counts.
+
+Random unit vectors (no API key needed) are split across N worker processes; queries are
+issued from several client threads so all shards stay busy. Throughput can only scale up
+to the number of cores available (printed below).
+
+Run:
+  python -m benchmarks.sharded_search --n 200000 --dim 384 --shards 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.langchain.rag_demo.sharded import ShardedVectorStore
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.n, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    texts = [str(i) for i in range(args.n)]
+
+    reference = ArrayVectorStore(embedding=None)
+    reference.add_embeddings(texts, vectors, ids=texts)
+    expected = [[d.id for d, _ in reference.similarity_search_with_score_by_vector(q, args.k)] for q in queries[:20]]
+
+    print(f"{args.n} vectors x {args.dim} dims, {args.queries} queries from {args.clients} threads, {os.cpu_count()} CPUs")
+    print(f"{'index':<16} {'queries/s':>10} {'p50 ms':>8}")
+
+    def measure(label: str, search) -> None:
+        latencies = []
+
+        def one(q):
+            start = time.perf_counter()
+            search(q)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.clients) as pool:
+            list(pool.map(one, queries))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16} {args.queries / elapsed:>10.1f} {1000 * float(np.median(latencies)):>8.2f}")
+
+    measure("single process", lambda q: reference.similarity_search_with_score_by_vector(q, args.k))
+    with tempfile.TemporaryDirectory() as tmp:
+        for shards in args.shards:
+            store = ShardedVectorStore(embedding=None, shards=shards, path=f"{tmp}/{shards}")
+            try:
+                store.add_embeddings(texts, vectors, ids=texts)
+                got = [[d.id for d, _ in store.similarity_search_with_score_by_vector(q, args.k)] for q in queries[:20]]
+                assert got == expected, "sharded results differ from the single index"
+                measure(f"{shards} shard(s)", lambda q: store.similarity_search_with_score_by_vector(q, args.k))
+            finally:
+                store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: recall vs memory for ArrayVectorStore storage modes.
+
+Synthetic clustered unit vectors stand in for embeddings (no API key needed). Recall@k is
+measured against exact float32 search; "+rerank" re-scores the top candidates exactly
+from the memory-mapped float32 file, which stays on disk.
+
+Run:
+  python -m benchmarks.vector_quantization --n 50000 --dim 384 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
+
+PYTHON_FLOAT_LIST_BYTES = 8 + 24  # list slot + float object, per dimension
+
+
+def clustered(n: int, dim: int, rng: np.random.Generator, clusters: int = 200) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim))
+    points = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def build(mode: str, vectors: np.ndarray, subvectors: int, rerank_dir: str | None, rerank_factor: int) -> ArrayVectorStore:
+    options = {"subvectors": subvectors} if mode == "pq" else {}
+    store = ArrayVectorStore(embedding=None, storage=mode, storage_options=options,
+                           rerank_dir=rerank_dir, rerank_factor=rerank_factor)
+    texts = [str(i) for i in range(len(vectors))]
+    store.add_embeddings(texts, vectors, ids=texts)
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--subvectors", type=int, default=48)
+    parser.add_argument("--rerank-factor", type=int, default=4, help="candidates re-scored exactly = factor * k")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered(args.n, args.dim, rng)
+    queries = vectors[rng.choice(args.n, args.queries, replace=False)] + 0.05 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    truth = [set(np.argsort(-(vectors @ q))[: args.k]) for q in queries]
+
+    print(f"{args.n} vectors x {args.dim} dims, recall@{args.k} over {args.queries} queries")
+    print(f"python list[float]: {PYTHON_FLOAT_LIST_BYTES * args.dim:>6} B/vector")
+    print(f"{'mode':<14} {'B/vector':>9} {'vs list':>8} {'recall':>7} {'ms/query':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, rerank in [("float32", False), ("int8", False), ("int8", True), ("pq", False), ("pq", True)]:
+            store = build(mode, vectors, args.subvectors, tmp if rerank else None, args.rerank_factor)
+            start = time.perf_counter()
+            hits = 0
+            for q, expected in zip(queries, truth):
+                found = {int(doc.id) for doc, _ in store.similarity_search_with_score_by_vector(q, args.k)}
+                hits += len(found & expected)
+            elapsed = (time.perf_counter() - start) / args.queries
+            per_vector = store.nbytes / args.n
+            label = mode + (" +rerank" if rerank else "")
+            print(
+                f"{label:<14} {per_vector:>9.0f} {PYTHON_FLOAT_LIST_BYTES * args.dim / per_vector:>7.0f}x "
+                f"{hits / (args.k * args.queries):>7.3f} {1000 * elapsed:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,8 @@ from langchain_core.messages import (
 )
 from langchain_core.tools import tool
 
+from src.agents.tools.cache import ToolResultCache
+
 
 # ----------------------------
 # 1) Tools
@@ -65,6 +67,11 @@ def cancel_order(order_id: str) -> dict:
 
 TOOLS = {get_order_status.name: get_order_status, cancel_order.name: cancel_order}
 
+# Status lookups are read-only: reuse them within and across turns until the order changes.
+TOOL_CACHE = ToolResultCache(on_event=lambda event, payload: print(f"[{event}] {payload}"))
+TOOL_CACHE.register("get_order_status", ttl=120.0)
+TOOL_CACHE.invalidate_on("cancel_order", "get_order_status", match_args=("order_id",))
+
 
 # ----------------------------
 # 2) Agent "decision" schema
@@ -187,7 +194,7 @@ def run_agent_turn(state: Dict[str, Any], user_input: str, *, max_steps: int = 4
             state["messages"].append(AIMessage(content=answer))
             return answer
 
-        observation = tool_fn.invoke(json.loads(tool_args)["order_id"])
+        observation = TOOL_CACHE.invoke(tool_fn, {"order_id": json.loads(tool_args)["order_id"]})
 
         # Store in scratchpad (this is "agent memory/state in the loop")
         state["scratchpad_steps"].append({
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CacheKey = Tuple[str, Optional[str], str]
+EventHook = Callable[[str, dict], None]
+
+
+def normalize_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Default argument normalization: trim strings so ' mug' and 'mug' share an entry."""
+    return {k: v.strip() if isinstance(v, str) else v for k, v in args.items()}
+
+
+@dataclass
+class CachePolicy:
+    ttl: float
+    normalize: Callable[[Dict[str, Any]], Dict[str, Any]] = normalize_args
+
+
+@dataclass
+class Invalidation:
+    target: str
+    # Only drop target entries whose values for these args equal the mutating call's values.
+    # Empty = drop every cached entry of the target tool.
+    match_args: Tuple[str, ...] = ()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    scope: Optional[str]
+    args: Dict[str, Any]
+    expires_at: float
+
+
+@dataclass
+class ToolResultCache:
+    """
+    TTL cache for read-only tool results, keyed on (tool name, normalized args).
+
+    - register(): mark a tool as cacheable
+    - invalidate_on(): a mutating tool drops related cached entries after it runs
+    - invoke(): drop-in replacement for tool.invoke(args)
+
+    Tools built per session (e.g. a cart's tools) set `tool.metadata["cache_scope"]`; entries and
+    invalidations are then confined to that scope.
+    """
+    on_event: Optional[EventHook] = None
+    policies: Dict[str, CachePolicy] = field(default_factory=dict)
+    invalidations: Dict[str, List[Invalidation]] = field(default_factory=dict)
+    _entries: Dict[CacheKey, _Entry] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # Bumped on every invalidation so a slow read that raced a write doesn't re-cache stale data.
+    _generation: int = field(default=0, repr=False)
+
+    def register(self, tool_name: str, *, ttl: float, normalize: Callable[[Dict[str, Any]], Dict[str, Any]] = normalize_args) -> None:
+        self.policies[tool_name] = CachePolicy(ttl=ttl, normalize=normalize)
+
+    def invalidate_on(self, mutating_tool: str, target: str, *, match_args: Tuple[str, ...] = ()) -> None:
+        self.invalidations.setdefault(mutating_tool, []).append(Invalidation(target, match_args))
+
+    def invoke(self, tool, args: Dict[str, Any]) -> Any:
+        name = tool.name
+        scope = (getattr(tool, "metadata", None) or {}).get("cache_scope")
+        policy = self.policies.get(name)
+
+        if policy is None:
+            result = tool.invoke(args)
+            self._invalidate(name, scope, args)
+            return result
+
+        norm = policy.normalize(args)
+        key = (name, scope, json.dumps(norm, sort_keys=True, default=str))
+        now = time.monotonic()
+
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+
+        if entry is not None:
+            self._emit("tool_cache.hit", {"tool": name, "args": norm})
+            return entry.value
+
+        self._emit("tool_cache.miss", {"tool": name, "args": norm})
+        result = tool.invoke(args)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = _Entry(value=result, scope=scope, args=norm, expires_at=now + policy.ttl)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _invalidate(self, mutating_tool: str, scope: Optional[str], args: Dict[str, Any]) -> None:
+        rules = self.invalidations.get(mutating_tool)
+        if not rules:
+            return
+
+        # Normalize the mutating call's args the way each target normalized its keys
+        norms = {}
+        for rule in rules:
+            if rule.target not in norms:
+                policy = self.policies.get(rule.target)
+                norms[rule.target] = (policy.normalize if policy else normalize_args)(args)
+        dropped = 0
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                tool_name = key[0]
+                entry = self._entries[key]
+                if entry.scope != scope:
+                    continue
+                for rule in rules:
+                    if rule.target != tool_name:
+                        continue
+                    if all(entry.args.get(a) == norms[tool_name].get(a) for a in rule.match_args):
+                        del self._entries[key]
+                        dropped += 1
+                        break
+
+        if dropped:
+            self._emit("tool_cache.invalidated", {"by": mutating_tool, "entries": dropped})
+
+    def _emit(self, event: str, payload: dict) -> None:
+        if self.on_event is not None:
+            self.on_event(event, payload)
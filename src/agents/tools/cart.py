@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Protocol
+
+
+class CartPersistence(Protocol):
+    def record_add(self, session_id: str, sku: str, qty: int) -> None:
+        ...
+
+    def load(self) -> Dict[str, Dict[str, int]]:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class WalCartPersistence:
+    """
+    Append-only JSONL write-ahead log; replayed on startup.
+
+    Every record is fsynced before `record_add` returns, so an acknowledged add survives an
+    OS crash. `fsync=False` only flushes to the OS (survives a process crash, not a power loss).
+    """
+
+    def __init__(self, path: str | Path, *, fsync: bool = True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def record_add(self, session_id: str, sku: str, qty: int) -> None:
+        line = json.dumps({"session_id": session_id, "sku": sku, "qty": qty}) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def load(self) -> Dict[str, Dict[str, int]]:
+        carts: Dict[str, Dict[str, int]] = {}
+        if not self.path.exists():
+            return carts
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                items = carts.setdefault(rec["session_id"], {})
+                items[rec["sku"]] = items.get(rec["sku"], 0) + rec["qty"]
+        return carts
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class SqliteCartPersistence:
+    """SQLite (WAL journal) table of cart lines; one connection per thread."""
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cart_items ("
+            " session_id TEXT NOT NULL, sku TEXT NOT NULL, qty INTEGER NOT NULL,"
+            " PRIMARY KEY (session_id, sku))"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def record_add(self, session_id: str, sku: str, qty: int) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO cart_items (session_id, sku, qty) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id, sku) DO UPDATE SET qty = qty + excluded.qty",
+                (session_id, sku, qty),
+            )
+
+    def load(self) -> Dict[str, Dict[str, int]]:
+        carts: Dict[str, Dict[str, int]] = {}
+        for session_id, sku, qty in self._conn().execute("SELECT session_id, sku, qty FROM cart_items"):
+            carts.setdefault(session_id, {})[sku] = qty
+        return carts
+
+    def close(self) -> None:
+        """Close every thread's connection (they may be closed from another thread)."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+@dataclass
+class CartStore:
+    """A single session's cart. Each cart has its own lock, so sessions never contend."""
+    session_id: str = "default"
+    items: Dict[str, int] = field(default_factory=dict)
+    persistence: Optional[CartPersistence] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, sku: str, qty: int) -> None:
+        if qty <= 0:
+            raise ValueError("qty must be > 0")
+        with self._lock:
+            # Write-ahead: the change is persisted before it becomes visible.
+            if self.persistence is not None:
+                self.persistence.record_add(self.session_id, sku, qty)
+            self.items[sku] = self.items.get(sku, 0) + qty
+
+    def view(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.items)
+
+
+class CartService:
+    """Per-session carts, created on first use and optionally restored from persistence."""
+
+    def __init__(self, persistence: Optional[CartPersistence] = None):
+        self.persistence = persistence
+        self._carts: Dict[str, CartStore] = {}
+        self._lock = threading.Lock()  # only taken when a session's cart is created
+        if persistence is not None:
+            for session_id, items in persistence.load().items():
+                self._carts[session_id] = CartStore(session_id, items, persistence)
+
+    @classmethod
+    def from_path(cls, path: str | Path | None) -> "CartService":
+        """`.jsonl`/`.wal` -> write-ahead log, anything else -> SQLite, None -> memory only."""
+        if not path:
+            return cls()
+        if Path(path).suffix in {".jsonl", ".wal"}:
+            return cls(WalCartPersistence(path))
+        return cls(SqliteCartPersistence(path))
+
+    def close(self) -> None:
+        """Close the persistence backend (the log file or database connections)."""
+        if self.persistence is not None:
+            self.persistence.close()
+
+    def __enter__(self) -> "CartService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def cart(self, session_id: str) -> CartStore:
+        cart = self._carts.get(session_id)
+        if cart is None:
+            with self._lock:
+                cart = self._carts.setdefault(session_id, CartStore(session_id, persistence=self.persistence))
+        return cart
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+ToolCall = Dict[str, Any]
+
+
+def _timeout_for(call: ToolCall, timeouts: Optional[Dict[str, float]], default: float) -> float:
+    return (timeouts or {}).get(call["name"], default)
+
+
+def _timeout_message(call: ToolCall, timeout: float) -> ToolMessage:
+    # Same "recoverable observation" shape the agent loops use for other tool failures.
+    return ToolMessage(
+        content=f"TOOL_ERROR: Timeout: '{call['name']}' did not finish within {timeout:.1f}s",
+        tool_call_id=call.get("id"),
+    )
+
+
+def execute_tool_calls(
+        calls: List[ToolCall],
+        run_call: Callable[[ToolCall], ToolMessage],
+        *,
+        parallel_safe: Collection[str] = (),
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = DEFAULT_TOOL_TIMEOUT,
+        max_workers: int = 8,
+) -> List[ToolMessage]:
+    """
+    Run a batch of tool calls, concurrently where that can't change the outcome.
+
+    `run_call` turns one tool call into its ToolMessage (including error handling).
+    Consecutive calls to tools named in `parallel_safe` (read-only tools) run together
+    on a thread pool; any other call runs alone, in order, after everything before it
+    has finished, so a write is never reordered against the reads around it.
+
+    Read-only calls get a deadline (per tool name via `timeouts`), counted from when the
+    call starts running; one that misses it is reported as a TOOL_ERROR observation and
+    left to finish in the background. Other calls are never abandoned: a write that is
+    still running could be applied after the model has been told it failed. Results keep
+    the order of `calls`, so the transcript looks exactly like the sequential version.
+    """
+    tool_messages: List[ToolMessage] = []
+    batch: List[ToolCall] = []
+    for call in calls:
+        if call["name"] in parallel_safe:
+            batch.append(call)
+            continue
+        tool_messages += _run_concurrently(batch, run_call, timeouts, default_timeout, max_workers)
+        batch = []
+        tool_messages.append(run_call(call))
+    tool_messages += _run_concurrently(batch, run_call, timeouts, default_timeout, max_workers)
+    return tool_messages
+
+
+def _run_concurrently(
+        calls: List[ToolCall],
+        run_call: Callable[[ToolCall], ToolMessage],
+        timeouts: Optional[Dict[str, float]],
+        default_timeout: float,
+        max_workers: int,
+) -> List[ToolMessage]:
+    if not calls:
+        return []
+
+    started: List[Optional[float]] = [None] * len(calls)
+    started_events = [threading.Event() for _ in calls]
+
+    def _run(i: int, call: ToolCall) -> ToolMessage:
+        started[i] = time.monotonic()
+        started_events[i].set()
+        return run_call(call)
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(calls)), thread_name_prefix="tool")
+    try:
+        # Each call runs in a copy of the caller's context, so context variables (the
+        # active trace span, LangChain's run config) carry over into the pool threads.
+        futures: List[Future] = [
+            pool.submit(contextvars.copy_context().run, _run, i, call) for i, call in enumerate(calls)
+        ]
+
+        tool_messages: List[ToolMessage] = []
+        for i, (call, future) in enumerate(zip(calls, futures)):
+            timeout = _timeout_for(call, timeouts, default_timeout)
+            # A call queued behind a stuck one gets its own timeout to obtain a worker.
+            if not started_events[i].wait(timeout) and future.cancel():
+                tool_messages.append(_timeout_message(call, timeout))
+                continue
+            started_events[i].wait()
+            remaining = max(0.0, started[i] + timeout - time.monotonic())
+            try:
+                tool_messages.append(future.result(timeout=remaining))
+            except FutureTimeout:
+                tool_messages.append(_timeout_message(call, timeout))
+        return tool_messages
+    finally:
+        # Don't block the agent loop on a read that blew its deadline.
+        pool.shutdown(wait=False, cancel_futures=True)
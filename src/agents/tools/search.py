@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+import re
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+NGRAM = 3
+# Haystacks are padded so every 1-2 character substring starts some trigram
+_PAD = "\x00" * (NGRAM - 1)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _contains(posting: array, row: int) -> bool:
+    # Postings are appended in row order, so they are sorted: binary search instead of a set.
+    i = bisect_left(posting, row)
+    return i < len(posting) and posting[i] == row
+
+
+class CatalogIndex:
+    """
+    In-memory product catalog index.
+
+    - sku -> row hash map for O(1) detail lookups
+    - inverted index of name tokens (products matching every query word rank first)
+    - inverted index of character trigrams over "name sku" (substring matches); queries
+      shorter than a trigram merge the postings of the trigrams they are a prefix of
+
+    Posting lists are compact `array('I')` row ids so a 1M-SKU catalog fits comfortably in memory.
+    """
+
+    def __init__(self) -> None:
+        self.products: List[dict] = []
+        self._by_sku: Dict[str, int] = {}
+        self._haystacks: List[str] = []
+        self._tokens: Dict[str, array] = {}
+        self._ngrams: Dict[str, array] = {}
+        self._prefixes: Dict[str, List[str]] = {}  # 1..NGRAM-1 char prefix -> trigrams starting with it
+
+    # -------- building --------
+    def add(self, product: dict) -> None:
+        sku = product["sku"]
+        if sku in self._by_sku:
+            raise ValueError(f"Duplicate SKU {sku}")
+
+        row = len(self.products)
+        self.products.append(product)
+        self._by_sku[sku] = row
+
+        name = product["name"].lower()
+        haystack = f"{name}\x00{sku.lower()}"
+        self._haystacks.append(haystack)
+
+        for token in set(_tokens(name)):
+            self._tokens.setdefault(token, array("I")).append(row)
+        for gram in _ngrams(haystack + _PAD):
+            posting = self._ngrams.get(gram)
+            if posting is None:
+                posting = self._ngrams[gram] = array("I")
+                for size in range(1, NGRAM):
+                    self._prefixes.setdefault(gram[:size], []).append(gram)
+            posting.append(row)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "CatalogIndex":
+        index = cls()
+        for record in records:
+            index.add(record)
+        return index
+
+    @classmethod
+    def from_jsonl(cls, path: str | Path) -> "CatalogIndex":
+        with Path(path).open("r", encoding="utf-8") as f:
+            return cls.from_records(json.loads(line) for line in f if line.strip())
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "CatalogIndex":
+        with Path(path).open("r", encoding="utf-8", newline="") as f:
+            return cls.from_records(
+                {**row, "price_gbp": float(row["price_gbp"])} for row in csv.DictReader(f)
+            )
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "CatalogIndex":
+        path = Path(path)
+        if path.suffix == ".csv":
+            return cls.from_csv(path)
+        return cls.from_jsonl(path)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    # -------- lookups --------
+    def get(self, sku: str) -> Optional[dict]:
+        row = self._by_sku.get(sku)
+        return None if row is None else self.products[row]
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Ranked search over product name and SKU. Results, best first:
+          1. exact SKU match
+          2. products whose name contains every query word (catalog order)
+          3. remaining substring matches on name/SKU, i.e. the old linear-scan semantics
+
+        Every stage is evaluated lazily and stops once `limit` rows are collected, so broad
+        queries cost about as much as narrow ones.
+        """
+        q = query.lower().strip()
+        if not q or limit <= 0:
+            return []
+
+        rows: Dict[int, None] = {}  # insertion-ordered set
+
+        sku = query.strip()
+        exact = self._by_sku.get(sku, self._by_sku.get(sku.upper()))
+        if exact is not None:
+            rows[exact] = None
+
+        for stage in (self._word_rows(q), self._substring_rows(q)):
+            for row in stage:
+                if len(rows) >= limit:
+                    break
+                rows.setdefault(row, None)
+
+        return [self.products[row] for row in rows]
+
+    def _word_rows(self, q: str) -> Iterator[int]:
+        postings = [self._tokens.get(t) for t in set(_tokens(q))]
+        if not postings or any(p is None for p in postings):
+            return
+        postings.sort(key=len)
+        rarest, rest = postings[0], postings[1:]
+        for row in rarest:
+            if all(_contains(posting, row) for posting in rest):
+                yield row
+
+    def _substring_rows(self, q: str) -> Iterator[int]:
+        if len(q) < NGRAM:
+            # Every row with a trigram starting with q contains q: merge those postings in
+            # catalog order (lazily, so the caller stops after `limit` rows) instead of scanning.
+            postings = [self._ngrams[g] for g in self._prefixes.get(q, ())]
+            last = -1
+            for row in heapq.merge(*postings):
+                if row != last:
+                    last = row
+                    yield row
+            return
+
+        grams = [self._ngrams.get(g) for g in _ngrams(q)]
+        if any(p is None for p in grams):
+            return
+        for row in min(grams, key=len):
+            if q in self._haystacks[row]:
+                yield row
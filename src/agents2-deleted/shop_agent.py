@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import json
-from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
@@ -17,24 +16,18 @@ from langchain_core.messages import (
 )
 from langchain_core.runnables import RunnableLambda
 
-from src.config import OPENAI_MODEL, SHOPAGENT_DEBUG
+from src.agents.tools.cache import ToolResultCache
+from src.agents.tools.cart import CartService, CartStore
+from src.agents.tools.executor import execute_tool_calls
+from src.agents.tools.search import CatalogIndex
+from src.config import OPENAI_MODEL, SHOPAGENT_CART_STORE, SHOPAGENT_CATALOG, SHOPAGENT_DEBUG
+from src.observability.spans import SpanCallbackHandler, default_recorder
 
 
 # -----------------------------
 # 1) Minimal "backend" state
 # -----------------------------
-@dataclass
-class CartStore:
-    items: Dict[str, int] = field(default_factory=dict)
-
-    def add(self, sku: str, qty: int) -> None:
-        if qty <= 0:
-            raise ValueError("qty must be > 0")
-        self.items[sku] = self.items.get(sku, 0) + qty
-
-    def view(self) -> Dict[str, int]:
-        return dict(self.items)
-
+# Carts live in CartService (per-session CartStore with its own lock, optional WAL/SQLite persistence).
 
 CATALOG = [
     {"sku": "TSHIRT-001", "name": "Plain T-Shirt", "price_gbp": 12.99},
@@ -42,19 +35,25 @@ CATALOG = [
     {"sku": "HOODIE-123", "name": "Zip Hoodie", "price_gbp": 39.00},
 ]
 
+# Indexed view of the catalog (SKU hash map + token/trigram index); point SHOPAGENT_CATALOG
+# at a .jsonl/.csv export to run against a full-size catalog instead of the demo rows.
+CATALOG_INDEX = (
+    CatalogIndex.from_file(SHOPAGENT_CATALOG) if SHOPAGENT_CATALOG else CatalogIndex.from_records(CATALOG)
+)
+
 
 # -----------------------------
 # 2) Tools
 # -----------------------------
 class SearchInput(BaseModel):
     query: str = Field(..., description="Free-text product search query")
+    limit: int = Field(10, ge=1, le=50, description="Maximum number of products to return")
 
 
 @tool(args_schema=SearchInput)
-def search_catalog(query: str) -> List[dict]:
-    """Search the product catalog by name keyword; returns matching products."""
-    q = query.lower().strip()
-    return [p for p in CATALOG if q in p["name"].lower() or q in p["sku"].lower()]
+def search_catalog(query: str, limit: int = 10) -> List[dict]:
+    """Search the product catalog by name keyword; returns the best matching products."""
+    return CATALOG_INDEX.search(query, limit=limit)
 
 
 class GetProductDetailsInput(BaseModel):
@@ -64,10 +63,10 @@ class GetProductDetailsInput(BaseModel):
 @tool(args_schema=GetProductDetailsInput)
 def get_product_details(sku: str) -> Optional[dict]:
     """Get product details by SKU."""
-    for p in CATALOG:
-        if p["sku"] == sku:
-            return p
-    raise ValueError(f"SKU {sku} not found")
+    product = CATALOG_INDEX.get(sku)
+    if product is None:
+        raise ValueError(f"SKU {sku} not found")
+    return product
 
 
 class AddToCartInput(BaseModel):
@@ -81,6 +80,7 @@ def make_add_to_cart_tool(cart: CartStore):
         """Add a product to the cart."""
         cart.add(sku=sku, qty=qty)
         return f"Added {qty} x {sku} to cart."
+    add_to_cart.metadata = {"cache_scope": cart.session_id}
     return add_to_cart
 
 
@@ -89,6 +89,7 @@ def make_view_cart_tool(cart: CartStore):
     def view_cart() -> dict:
         """View current cart contents."""
         return cart.view()
+    view_cart.metadata = {"cache_scope": cart.session_id}
     return view_cart
 
 
@@ -130,44 +131,69 @@ def build_planner(tools):
 # -----------------------------
 # 4) Tool execution
 # -----------------------------
-def run_tool_calls(ai_message, tools_by_name: Dict[str, Any]) -> List[ToolMessage]:
-    tool_messages: List[ToolMessage] = []
-    calls = getattr(ai_message, "tool_calls", []) or []
+# Deadlines for the read-only tools; cart writes always run to completion (see execute_tool_calls).
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "search_catalog": 5.0,
+    "get_product_details": 5.0,
+    "view_cart": 5.0,
+}
 
-    trace("tool_calls.detected", {"count": len(calls), "calls": calls})
 
-    for call in calls:
-        name = call["name"]
-        args = call.get("args", {})
-        tool = tools_by_name.get(name)
+# Read-only tools are memoized across turns; cart writes drop the cached cart view.
+TOOL_CACHE = ToolResultCache(on_event=lambda event, payload: trace(event, payload))
+TOOL_CACHE.register("search_catalog", ttl=300.0,
+                    normalize=lambda args: {"query": args.get("query", "").strip().lower(),
+                                            "limit": args.get("limit", 10)})
+TOOL_CACHE.register("get_product_details", ttl=300.0)
+TOOL_CACHE.register("view_cart", ttl=60.0)
+TOOL_CACHE.invalidate_on("add_to_cart", "view_cart")
+
+
+def run_tool_call(call: Dict[str, Any], tools_by_name: Dict[str, Any]) -> ToolMessage:
+    name = call["name"]
+    args = call.get("args", {})
+    tool = tools_by_name.get(name)
+
+    if tool is None: # not present in available tools
+        # Model hallucinated an unknown tool name: return a recoverable observation.
+        content = f"TOOL_ERROR: UnknownTool: '{name}'. Available tools: {sorted(tools_by_name.keys())}"
+        return ToolMessage(content=content, tool_call_id=call["id"])
 
-        if tool is None: # not present in available tools
-            # Model hallucinated an unknown tool name: return a recoverable observation.
-            content = f"TOOL_ERROR: UnknownTool: '{name}'. Available tools: {sorted(tools_by_name.keys())}"
-            tool_messages.append(ToolMessage(content=content, tool_call_id=call["id"]))
-            continue
+    try:
+        with default_recorder().span(name, "tool"):
+            obs = TOOL_CACHE.invoke(tool, args)
 
-        try:
-            obs = tool.invoke(args)
+        # Keep observations compact and predictable (avoid dumping huge dicts).
+        if isinstance(obs, (dict, list)):
+            content = json.dumps(obs, ensure_ascii=False)[:2000]
+        else:
+            content = str(obs)[:2000]
 
-            # Keep observations compact and predictable (avoid dumping huge dicts).
-            if isinstance(obs, (dict, list)):
-                content = json.dumps(obs, ensure_ascii=False)[:2000]
-            else:
-                content = str(obs)[:2000]
+        trace("tool_calls.executed", {"tool": name, "args": args, "obs_preview": content[:300]})
 
-            trace("tool_calls.executed", {"tool": name, "args": args, "obs_preview": content[:300]})
+    except ValueError as e:
+        # Treat input-validation-ish failures as recoverable: model can fix args and retry.
+        content = f"TOOL_ERROR: BadInput: {e}"
+    except Exception as e:
+        # Unknown failures: still return as observation, but signal it may not be retryable.
+        content = f"TOOL_ERROR: ToolFailed: {type(e).__name__}: {e}"
 
-        except ValueError as e:
-            # Treat input-validation-ish failures as recoverable: model can fix args and retry.
-            content = f"TOOL_ERROR: BadInput: {e}"
-        except Exception as e:
-            # Unknown failures: still return as observation, but signal it may not be retryable.
-            content = f"TOOL_ERROR: ToolFailed: {type(e).__name__}: {e}"
+    return ToolMessage(content=content, tool_call_id=call["id"])
 
-        tool_messages.append(ToolMessage(content=content, tool_call_id=call["id"]))
 
-    return tool_messages
+def run_tool_calls(ai_message, tools_by_name: Dict[str, Any]) -> List[ToolMessage]:
+    calls = getattr(ai_message, "tool_calls", []) or []
+
+    trace("tool_calls.detected", {"count": len(calls), "calls": calls})
+
+    # The model emits parallel tool calls; the cacheable (read-only) ones run concurrently,
+    # cart writes one at a time in call order. Observations stay in call order.
+    return execute_tool_calls(
+        calls,
+        lambda call: run_tool_call(call, tools_by_name),
+        parallel_safe=TOOL_CACHE.policies.keys(),
+        timeouts=TOOL_TIMEOUTS,
+    )
 
 
 
@@ -191,7 +217,7 @@ def chat_turn(
     for step in range(1, max_steps + 1):
         trace("loop.step.start", {"step": step})
 
-        ai = planner.invoke({"messages": messages})
+        ai = planner.invoke({"messages": messages}, config={"callbacks": [SPAN_HANDLER]})
         messages = messages + [ai]
 
         calls = getattr(ai, "tool_calls", None)
@@ -213,7 +239,14 @@ def chat_turn(
     return messages
 
 
+# Spans for turns, planner LLM calls (with token usage) and tool calls; tool cache hits are counted.
+# default_recorder() is created on first use, so importing this module starts no /metrics server.
+SPAN_HANDLER = SpanCallbackHandler()
+
+
 def trace(event: str, payload: dict | None = None) -> None:
+    if event in ("tool_cache.hit", "tool_cache.miss"):
+        default_recorder().record_cache(f"tool:{payload['tool']}", event == "tool_cache.hit")
     if not SHOPAGENT_DEBUG:
         return
     print(f"[trace] {event}")
@@ -222,31 +255,37 @@ def trace(event: str, payload: dict | None = None) -> None:
 
 
 def main():
-    cart = CartStore()
-    tools = [search_catalog, make_add_to_cart_tool(cart), make_view_cart_tool(cart), get_product_details]
-    tools_by_name = {t.name: t for t in tools}
-    planner = build_planner(tools)
-
-    print("ShopAgent (LCEL + tool calling) ready.")
-    print("Try: 'Find a mug and add 2 to my cart' or 'What's in my cart?'\n")
-
-    history: List[BaseMessage] = []
-
-    while True:
-        text = input("You> ").strip()
-        if text.lower() in {"quit", "exit"}:
-            break
-
-        history = chat_turn(
-            user_text=text,
-            messages=history,
-            planner=planner,
-            tools_by_name=tools_by_name,
-            max_steps=6,
-        )
-
-        # last AI message is typically the final answer
-        last_ai: Optional[BaseMessage] = next(
-            (m for m in reversed(history) if m.type == "ai"), None
-        )
-        print(f"\nAgent> {getattr(last_ai, 'content', '')}\n")
+    # Closing the service closes the cart log / database when the session ends
+    with CartService.from_path(SHOPAGENT_CART_STORE) as carts:
+        cart = carts.cart(os.getenv("SHOPAGENT_SESSION", "default"))
+        tools = [search_catalog, make_add_to_cart_tool(cart), make_view_cart_tool(cart), get_product_details]
+        tools_by_name = {t.name: t for t in tools}
+        planner = build_planner(tools)
+
+        print("ShopAgent (LCEL + tool calling) ready.")
+        print("Try: 'Find a mug and add 2 to my cart' or 'What's in my cart?'\n")
+
+        history: List[BaseMessage] = []
+        spans = default_recorder()
+
+        while True:
+            text = input("You> ").strip()
+            if text.lower() in {"quit", "exit"}:
+                break
+
+            with spans.span("chat_turn"):
+                history = chat_turn(
+                    user_text=text,
+                    messages=history,
+                    planner=planner,
+                    tools_by_name=tools_by_name,
+                    max_steps=6,
+                )
+
+            # last AI message is typically the final answer
+            last_ai: Optional[BaseMessage] = next(
+                (m for m in reversed(history) if m.type == "ai"), None
+            )
+            print(f"\nAgent> {getattr(last_ai, 'content', '')}\n")
+
+        print(spans.summary())
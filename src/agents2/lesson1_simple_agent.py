@@ -13,6 +13,7 @@ from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 
+from src.agents.tools.executor import execute_tool_calls
 from src.config import OPENAI_MODEL
 
 SYSTEM = SystemMessage(content="You are a precise assistant. Use tools when needed.")
@@ -50,34 +51,34 @@ def _plan(state: List[BaseMessage]) -> AIMessage:
     return ai
 
 
+def _run_tool_call(call: Dict[str, Any]) -> ToolMessage:
+    """Run a single tool call and wrap the result (or error) as a ToolMessage observation."""
+    name = call["name"]
+    args = call.get("args", {})
+    call_id = call.get("id")
+
+    tool = TOOL_BY_NAME.get(name)
+    if tool is None:
+        # Observation for invalid tool name (guardrail)
+        return ToolMessage(
+            tool_call_id=call_id,
+            content=f"TOOL_ERROR: Unknown tool '{name}'. Available: {list(TOOL_BY_NAME)}",
+        )
+
+    try:
+        # Prefer tool.invoke for consistent behavior across tool types
+        result = tool.invoke(args)
+        return ToolMessage(tool_call_id=call_id, content=str(result))
+    except Exception as e:
+        return ToolMessage(tool_call_id=call_id, content=f"TOOL_ERROR: {e!r}")
+
+
 def _execute_tools(last: AIMessage) -> List[ToolMessage]:
-    """Executor step: run any tool calls from the last AIMessage and append ToolMessage observations."""
-
-    tool_messages: List[ToolMessage] = []
-    for call in last.tool_calls:
-        name = call["name"]
-        args = call.get("args", {})
-        call_id = call.get("id")
-
-        tool = TOOL_BY_NAME.get(name)
-        if tool is None:
-            # Observation for invalid tool name (guardrail)
-            tool_messages.append(
-                ToolMessage(
-                    tool_call_id=call_id,
-                    content=f"TOOL_ERROR: Unknown tool '{name}'. Available: {list(TOOL_BY_NAME)}",
-                )
-            )
-            continue
-
-        try:
-            # Prefer tool.invoke for consistent behavior across tool types
-            result = tool.invoke(args)
-            tool_messages.append(ToolMessage(tool_call_id=call_id, content=str(result)))
-        except Exception as e:
-            tool_messages.append(ToolMessage(tool_call_id=call_id, content=f"TOOL_ERROR: {e!r}"))
-
-    return tool_messages
+    """Executor step: run any tool calls from the last AIMessage and append ToolMessage observations.
+
+    Both tools are pure, so all calls run concurrently; observations come back in tool_call order.
+    """
+    return execute_tool_calls(last.tool_calls, _run_tool_call, parallel_safe=TOOL_BY_NAME.keys())
 
 
 def _should_continue(state: Dict[str, Any]) -> bool:
@@ -1,6 +1,27 @@
 import os
 
+from dotenv import load_dotenv
+
+# Every entry point imports this module, so .env applies to all of them (real env vars win)
+load_dotenv()
+
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 # TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0"))
 
-SHOPAGENT_DEBUG = bool(os.getenv("SHOPAGENT_DEBUG", "0") == "1")
\ No newline at end of file
+SHOPAGENT_DEBUG = bool(os.getenv("SHOPAGENT_DEBUG", "0") == "1")
+SHOPAGENT_CATALOG = os.getenv("SHOPAGENT_CATALOG")  # optional .jsonl/.csv product catalog
+SHOPAGENT_CART_STORE = os.getenv("SHOPAGENT_CART_STORE")  # optional cart persistence: .db (SQLite) or .jsonl (WAL)
+
+LANGGRAPH_CHECKPOINT_DB = os.getenv("LANGGRAPH_CHECKPOINT_DB", ".langgraph/checkpoints.sqlite")
+LANGGRAPH_THREAD_ID = os.getenv("LANGGRAPH_THREAD_ID")  # set to resume an interrupted graph run
+LANGGRAPH_NODE_CACHE_DB = os.getenv("LANGGRAPH_NODE_CACHE_DB")  # optional on-disk cache for memoized nodes
+LANGGRAPH_STREAM = bool(os.getenv("LANGGRAPH_STREAM", "0") == "1")  # stream node progress and tokens in main()
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "text-embedding-3-small")
+LANGGRAPH_INDEX_DIR = os.getenv("LANGGRAPH_INDEX_DIR", ".langgraph/indexes")  # persisted retriever indexes; "" disables
+
+OBSERVABILITY_SAMPLE_RATE = float(os.getenv("OBSERVABILITY_SAMPLE_RATE", "1.0"))  # share of traces recorded as spans
+OBSERVABILITY_OTLP_FILE = os.getenv("OBSERVABILITY_OTLP_FILE", "")  # append spans as OTLP/JSON lines; "" disables
+OBSERVABILITY_PROMETHEUS_PORT = int(os.getenv("OBSERVABILITY_PROMETHEUS_PORT", "0"))  # serve /metrics; 0 disables
+TELEMETRY_FILE = os.getenv("TELEMETRY_FILE", "")  # per-call LLM telemetry (JSONL), e.g. .observability/telemetry.jsonl; "" keeps it in memory
+USAGE_LEDGER_FILE = os.getenv("USAGE_LEDGER_FILE", "")  # token/cost totals per session, model and stage (JSON, written at exit); "" keeps them in memory
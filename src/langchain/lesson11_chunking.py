@@ -6,6 +6,8 @@ from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
+from src.langchain.rag_demo.semantic_chunker import SemanticChunker
+
 raw_docs = [
     Document(
         page_content="RAG stands for Retrieval Augmented Generation. "
@@ -57,6 +59,23 @@ prompt = ChatPromptTemplate.from_messages([
 
 llm = ChatOpenAI(model="gpt-4.1-mini", temperature=0)
 
+def compare_semantic_chunking():
+    """
+    Comparison (not used by the chain above): semantic chunking of the same documents.
+
+    Whole sentences are grouped until the topic shifts or the token cap is hit, instead of
+    cutting every 25 characters. All sentences are embedded in one batched call, and fewer
+    chunks means fewer vectors to store.
+    """
+    semantic_chunks = SemanticChunker(embeddings, max_tokens=50).split_documents(raw_docs)
+    print(f"Recursive splitter: {len(chunks)} chunks; semantic chunker: {len(semantic_chunks)} chunks")
+    for c in semantic_chunks:
+        print(c.page_content, c.metadata)
+    print("---")
+
+
 def main():
     chain = inputs | prompt | llm | StrOutputParser()
-    print(chain.invoke("What does RAG stand for?"))
\ No newline at end of file
+    print(chain.invoke("What does RAG stand for?"))
+    print("--- Comparison: semantic chunking ---")
+    compare_semantic_chunking()
\ No newline at end of file
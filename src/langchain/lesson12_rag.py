@@ -2,10 +2,14 @@ from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableMap, RunnablePassthrough
-from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 
+from src.langchain.rag_demo.bm25 import BM25Index, HybridRetriever
+from src.langchain.rag_demo.context import merge_chunks
+from src.langchain.rag_demo.dedup import NearDuplicateFilter
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
+
 Document(
     page_content="RAG stands for Retrieval Augmented Generation...",
     metadata={
@@ -17,30 +21,39 @@ Document(
 
 splitter = RecursiveCharacterTextSplitter(
     chunk_size=500,
-    chunk_overlap=100
+    chunk_overlap=100,
+    add_start_index=True
 )
 
 embeddings = OpenAIEmbeddings(
     model="text-embedding-3-small"
 )
 
-vectorstore = InMemoryVectorStore.from_documents(
-    documents=[],  # start empty
-    embedding=embeddings
-)
+# Keeps a metadata index, so filtered searches only score the matching chunks
+vectorstore = ArrayVectorStore(embeddings)
+
+# Lexical index kept next to the vector store (same chunk ids) for exact-term matches
+bm25 = BM25Index()
+
+# Remembers every ingested chunk, so boilerplate repeated across documents is embedded once
+dedup = NearDuplicateFilter()
 
 def ingest_documents(raw_documents):
-    chunks = splitter.split_documents(raw_documents)
-    vectorstore.add_documents(chunks)
+    chunks = dedup.filter(splitter.split_documents(raw_documents))
+    ids = vectorstore.add_documents(chunks)
+    bm25.add_documents(chunks, ids=ids)
 
-# str → list[Document]
-retriever = vectorstore.as_retriever(
-    search_kwargs={"k": 4}
+# str → list[Document], dense and BM25 rankings fused
+retriever = HybridRetriever(
+    vectorstore=vectorstore,
+    bm25=bm25,
+    k=4
 )
 
 def format_docs(docs):
     lines = []
-    for d in docs:
+    # Adjacent chunks of one source are merged, so overlapping text appears once
+    for d in merge_chunks(docs):
         src = d.metadata.get("source", "unknown")
         lines.append(f"[{src}] {d.page_content}")
     return "\n\n".join(lines)
@@ -1,7 +1,9 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableMap, RunnableLambda
+from langchain_core.runnables import RunnableMap
+
+from src.observability.spans import SpanCallbackHandler, default_recorder
 
 llm = ChatOpenAI(
     model="gpt-4.1-mini",
@@ -34,18 +36,19 @@ chain = (
     RunnableMap({
         "question": lambda x: x["question"],
         "context": lambda x: get_context_for_question(x["question"]),
-        "logger": lambda x: print(f"Received input: {x}")
     })
-    | RunnableLambda(lambda x: (print(f"After RunnableMap: {x}"), x)[1])
     | prompt
-    | RunnableLambda(lambda x: (print(f"Rendered prompt:\n{x}"), x)[1])
     | llm
-    | RunnableLambda(lambda x: (print(f"LLM raw output: {x}"), x)[1])
     | StrOutputParser()
 )
 
 
 def main():
-    print(chain.invoke({
-        "question": "What does RAG stand for?",
-    }))
+    # Each stage (map, prompt, LLM with token usage, parser) is recorded as a span
+    spans = default_recorder()
+    with spans.span("lesson6_run"):
+        print(chain.invoke(
+            {"question": "What does RAG stand for?"},
+            config={"callbacks": [SpanCallbackHandler(spans)]},
+        ))
+    print(spans.summary())
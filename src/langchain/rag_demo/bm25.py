@@ -0,0 +1,212 @@
+"""
+Lexical (BM25) retrieval next to the vector store, and a hybrid retriever that fuses both.
+
+Dense embeddings are weak on identifiers: "US0378331005" or "AAPL US Equity" embed close to
+any other ISIN or ticker. BM25 matches them exactly. `HybridStore` keeps a vector store and
+a `BM25Index` in step (same ids, updated incrementally on every `add_documents`), and its
+retriever merges both rankings with reciprocal rank fusion. Queries that contain a
+security identifier (ISIN/CUSIP/SEDOL-shaped code or a Bloomberg ticker) present in the
+index are answered from BM25 alone, without an embedding call.
+
+    store = HybridStore(ArrayVectorStore(embedding=embeddings))
+    store.add_documents(chunks)
+    retriever = store.as_retriever(search_type="mmr", search_kwargs={"k": 5})
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+from src.langchain.rag_demo.metadata_index import MetadataIndex
+from src.langchain.rag_demo.query_context import QueryContext
+from src.langchain.rag_demo.vectorstore import drop_overlapping_spans
+
+_TOKEN = re.compile(r"[A-Za-z0-9]+")
+# Security codes: 6+ characters mixing letters with at least two digits (ISIN US0378331005,
+# SEDOL B0YBKJ7, FIGI BBG000B9XRY4) or a 9-digit CUSIP. Plain all-caps words (CRISPR, ISIN)
+# are ordinary vocabulary and go through dense retrieval.
+_IDENTIFIER = re.compile(r"^(?:(?=(?:[A-Za-z]*\d){2})(?=\d*[A-Za-z])[A-Za-z0-9]{6,}|\d{9})$")
+# Bloomberg tickers: "AAPL US Equity" -> ticker and exchange code
+_BLOOMBERG_TICKER = re.compile(r"\b([A-Z0-9]{1,6}) ([A-Z]{2}) (?:Equity|Comdty|Index|Curncy|Corp|Govt|Mtge|Muni|Pfd)\b")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t.lower() for t in _TOKEN.findall(text)]
+
+
+def identifier_terms(query: str) -> List[str]:
+    terms = [t.lower() for t in _TOKEN.findall(query) if _IDENTIFIER.match(t)]
+    for ticker, exchange in _BLOOMBERG_TICKER.findall(query):
+        terms += [ticker.lower(), exchange.lower()]
+    return terms
+
+
+class BM25Index:
+    """In-memory BM25 (Okapi) inverted index. `add_documents` can be called any number of times."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: List[Document] = []
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {doc position: term frequency}
+        self.doc_lengths: List[int] = []
+        self._total_length = 0
+        self.metadata_index = MetadataIndex()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_documents(self, documents: Sequence[Document], ids: Optional[Sequence[str]] = None) -> List[str]:
+        ids = list(ids) if ids is not None else [d.id or str(uuid.uuid4()) for d in documents]
+        with self._lock:
+            for doc, doc_id in zip(documents, ids):
+                position = len(self.documents)
+                self.documents.append(Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata))
+                terms = Counter(tokenize(doc.page_content))
+                for term, tf in terms.items():
+                    self.postings.setdefault(term, {})[position] = tf
+                length = sum(terms.values())
+                self.doc_lengths.append(length)
+                self._total_length += length
+            self.metadata_index.add([doc.metadata for doc in documents])
+        return ids
+
+    def contains(self, term: str) -> bool:
+        return term in self.postings
+
+    def search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        with self._lock:
+            n = len(self.documents)
+            if not n:
+                return []
+            allowed = self.metadata_index.rows(filter)
+            allowed = None if allowed is None else set(allowed.tolist())
+            avg_length = self._total_length / n
+            scores: Dict[int, float] = {}
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for position, tf in postings.items():
+                    if allowed is not None and position not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[position] / avg_length)
+                    scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self.documents[position], score) for position, score in top]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[Document]], *, k: int = 60) -> List[Document]:
+    """Merge rankings by sum of 1 / (k + rank); documents are matched by id (or content)."""
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = doc.id or doc.page_content
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense + BM25 retrieval fused with RRF; identifier queries skip the embedding call.
+
+    With search_type="mmr" the dense side is diversified with the vector store's MMR and
+    fused results that mostly repeat an earlier chunk's span are dropped. `filter` (see
+    metadata_index.py) restricts both sides to chunks whose metadata matches.
+
+    Accepts a `QueryContext` as well as a string; the dense side then searches by the
+    context's vector, so the query is embedded at most once across the whole chain.
+    """
+
+    vectorstore: VectorStore
+    bm25: BM25Index
+    search_type: str = "similarity"  # or "mmr"
+    k: int = 4
+    fetch_k: int = 20  # candidates taken from each ranking before fusion
+    lambda_mult: float = 0.5
+    rrf_k: int = 60
+    exact_match: bool = True
+    filter: Optional[Dict[str, Any]] = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(
+            self,
+            query: str | QueryContext,
+            *,
+            run_manager: CallbackManagerForRetrieverRun,
+    ) -> List[Document]:
+        ctx = query if isinstance(query, QueryContext) else QueryContext(query, self.vectorstore.embeddings)
+        query = ctx.question
+        lexical = [doc for doc, _ in self.bm25.search(query, self.fetch_k, filter=self.filter)]
+
+        if self.exact_match and lexical:
+            terms = identifier_terms(query)
+            if terms and all(self.bm25.contains(t) for t in terms):
+                if self.search_type == "mmr":
+                    lexical = drop_overlapping_spans(lexical)
+                return lexical[: self.k]
+
+        if self.search_type == "mmr":
+            dense = self.vectorstore.max_marginal_relevance_search_by_vector(
+                ctx.vector, k=self.k, fetch_k=self.fetch_k, lambda_mult=self.lambda_mult, filter=self.filter
+            )
+            fused = reciprocal_rank_fusion([dense, lexical], k=self.rrf_k)
+            return drop_overlapping_spans(fused)[: self.k]
+
+        dense = self.vectorstore.similarity_search_by_vector(ctx.vector, k=self.fetch_k, filter=self.filter)
+        return reciprocal_rank_fusion([dense, lexical], k=self.rrf_k)[: self.k]
+
+
+class HybridStore:
+    """A vector store and a BM25 index over the same chunks, kept in step."""
+
+    def __init__(self, vectorstore: VectorStore, bm25: Optional[BM25Index] = None):
+        self.vectorstore = vectorstore
+        self.bm25 = bm25 if bm25 is not None else BM25Index()
+
+    def add_documents(self, documents: Sequence[Document], **kwargs: Any) -> List[str]:
+        ids = self.vectorstore.add_documents(list(documents), **kwargs)
+        self.bm25.add_documents(documents, ids=ids)
+        return ids
+
+    def add_embeddings(self, documents: Sequence[Document], embeddings: Any) -> List[str]:
+        """Add chunks with precomputed vectors (the vector store needs an `add_embeddings`)."""
+        if not documents:
+            return []
+        ids = self.vectorstore.add_embeddings(
+            [doc.page_content for doc in documents],
+            embeddings,
+            [doc.metadata for doc in documents],
+            ids=[doc.id or str(uuid.uuid4()) for doc in documents],
+        )
+        self.bm25.add_documents(documents, ids=ids)
+        return ids
+
+    def as_retriever(
+            self,
+            search_type: str = "similarity",
+            search_kwargs: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+    ) -> HybridRetriever:
+        return HybridRetriever(
+            vectorstore=self.vectorstore,
+            bm25=self.bm25,
+            search_type=search_type,
+            **(search_kwargs or {}),
+            **kwargs,
+        )
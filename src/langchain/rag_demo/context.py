@@ -0,0 +1,88 @@
+"""
+Overlap-aware context assembly for RAG prompts.
+
+Retrieved chunks overlap by up to `chunk_overlap` characters, and neighbouring chunks of
+one passage are often retrieved together, so joining `page_content` verbatim repeats text
+in the prompt. `merge_chunks` groups chunks by source, orders them by position and merges
+chunks that touch or overlap into one span:
+
+  - with `start_index` metadata (splitter `add_start_index=True`) the offsets decide;
+  - without it, a suffix of one chunk that is a prefix of the next (>= min_overlap chars)
+    is treated as shared text.
+
+Sources keep the order of their best-ranked chunk. Chunks without a `source` can't be
+told apart from other documents' chunks, so they are passed through unmerged, in place.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+from langchain_core.documents import Document
+
+
+def _shared_suffix_prefix(a: str, b: str, min_overlap: int) -> int:
+    for size in range(min(len(a), len(b)), min_overlap - 1, -1):
+        if a.endswith(b[:size]):
+            return size
+    return 0
+
+
+def _merge_by_offsets(chunks: List[Document]) -> List[Document]:
+    chunks = sorted(chunks, key=lambda d: d.metadata["start_index"])
+    merged: List[Document] = []
+    for doc in chunks:
+        start = doc.metadata["start_index"]
+        if merged:
+            last = merged[-1]
+            last_end = last.metadata["start_index"] + len(last.page_content)
+            if start <= last_end:
+                tail = doc.page_content[last_end - start:]
+                last.page_content += tail
+                continue
+        merged.append(Document(page_content=doc.page_content, metadata=dict(doc.metadata)))
+    return merged
+
+
+def _merge_by_text(chunks: List[Document], min_overlap: int) -> List[Document]:
+    merged: List[Document] = []
+    for doc in chunks:
+        if merged:
+            last = merged[-1]
+            if doc.page_content in last.page_content:
+                continue
+            shared = _shared_suffix_prefix(last.page_content, doc.page_content, min_overlap)
+            if shared:
+                last.page_content += doc.page_content[shared:]
+                continue
+        merged.append(Document(page_content=doc.page_content, metadata=dict(doc.metadata)))
+    return merged
+
+
+def merge_chunks(docs: Sequence[Document], *, min_overlap: int = 20) -> List[Document]:
+    """Collapse overlapping/adjacent chunks of the same source into single documents."""
+    groups: List[List[Document]] = []
+    by_source: Dict[str, List[Document]] = {}
+    for doc in docs:
+        source = doc.metadata.get("source")
+        if not source:
+            groups.append([doc])
+        elif source in by_source:
+            by_source[source].append(doc)
+        else:
+            by_source[source] = [doc]
+            groups.append(by_source[source])
+
+    merged: List[Document] = []
+    for chunks in groups:
+        if len(chunks) == 1:
+            merged.append(chunks[0])
+        elif all("start_index" in d.metadata for d in chunks):
+            merged.extend(_merge_by_offsets(chunks))
+        else:
+            merged.extend(_merge_by_text(chunks, min_overlap))
+    return merged
+
+
+def assemble_context(docs: Sequence[Document], separator: str = "\n\n") -> str:
+    return separator.join(d.page_content for d in merge_chunks(docs))
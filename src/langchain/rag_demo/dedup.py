@@ -0,0 +1,110 @@
+"""
+Near-duplicate chunk filtering between splitting and embedding (MinHash + LSH).
+
+Boilerplate that repeats across documents (headers, disclaimers, navigation lists) would
+otherwise be embedded and stored once per copy. Each chunk gets a MinHash signature over
+its word 3-shingles; an LSH index (bands of signature rows) finds candidate matches in
+roughly constant time, and a candidate counts as a duplicate when the estimated Jaccard
+similarity is >= `threshold`. Duplicates are dropped and their source is appended to the
+kept chunk's `metadata["sources"]`.
+
+    dedup = NearDuplicateFilter()
+    chunks = dedup.filter(splitter.split_documents(raw_documents))
+
+`filter_with_vectors` does the same for chunks that already have their vectors (e.g. from
+`SemanticChunker.split_documents_with_vectors`) and keeps the two aligned.
+
+The filter is stateful, so repeated ingestion calls are deduplicated against everything
+ingested before. (A duplicate of a chunk from an earlier call is still dropped, but the
+already-stored copy's `sources` is not updated.)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+_WORD = re.compile(r"\w+")
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+
+def _shingle_hashes(text: str, size: int) -> np.ndarray:
+    words = _WORD.findall(text.lower())
+    shingles = {" ".join(words[i: i + size]) for i in range(max(len(words) - size + 1, 1))}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles],
+        dtype=np.uint64,
+    )
+
+
+class NearDuplicateFilter:
+    def __init__(self, *, num_perm: int = 128, bands: int = 32, threshold: float = 0.8, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        # a, b < 2**31 keep a * h + b below 2**64 for 32-bit shingle hashes.
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.kept: List[Document] = []
+        self.dropped = 0
+        self._signatures: List[np.ndarray] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = _shingle_hashes(text, self.shingle_size)
+        # (num_perm, n_shingles) permuted hashes, min over shingles: one vectorized pass per chunk.
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows: (band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _find_duplicate(self, signature: np.ndarray, keys: List[Tuple[int, bytes]]) -> int:
+        seen = set()
+        for key in keys:
+            for position in self._buckets.get(key, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                if np.mean(self._signatures[position] == signature) >= self.threshold:
+                    return position
+        return -1
+
+    def _keep(self, chunk: Document) -> bool:
+        """Index `chunk` and return True, or record it as a duplicate and return False (lock held)."""
+        signature = self.signature(chunk.page_content)
+        keys = self._band_keys(signature)
+        position = self._find_duplicate(signature, keys)
+        if position >= 0:
+            original = self.kept[position].metadata
+            sources = original.setdefault("sources", [original.get("source")])
+            if chunk.metadata.get("source") not in sources:
+                sources.append(chunk.metadata.get("source"))
+            self.dropped += 1
+            return False
+
+        for key in keys:
+            self._buckets.setdefault(key, []).append(len(self.kept))
+        self.kept.append(chunk)
+        self._signatures.append(signature)
+        return True
+
+    def filter(self, chunks: Sequence[Document]) -> List[Document]:
+        """Return the chunks that are not near-duplicates of an earlier chunk."""
+        with self._lock:
+            return [chunk for chunk in chunks if self._keep(chunk)]
+
+    def filter_with_vectors(self, chunks: Sequence[Document], vectors: np.ndarray) -> Tuple[List[Document], np.ndarray]:
+        """`filter` for chunks with precomputed vectors (row i belongs to chunks[i])."""
+        with self._lock:
+            keep = [i for i, chunk in enumerate(chunks) if self._keep(chunk)]
+        return [chunks[i] for i in keep], vectors[keep]
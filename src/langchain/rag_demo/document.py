@@ -1,6 +1,8 @@
 from pathlib import Path
 from langchain_core.documents import Document
 
+from src.langchain.rag_demo.context import assemble_context
+
 def read_document(path: str | Path) -> Document:
     """
     Read a text file and return it as a LangChain Document with metadata.
@@ -19,4 +21,5 @@ def read_document(path: str | Path) -> Document:
     )
 
 def format_docs(docs):
-    return "\n\n".join(d.page_content for d in docs)
\ No newline at end of file
+    # Merge overlapping chunks so text shared through chunk_overlap is sent only once
+    return assemble_context(docs)
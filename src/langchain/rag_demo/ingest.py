@@ -1,36 +1,90 @@
+import atexit
 import os
 
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.vectorstores import InMemoryVectorStore
+
+from src.langchain.rag_demo.bm25 import HybridStore
+from src.langchain.rag_demo.dedup import NearDuplicateFilter
+from src.langchain.rag_demo.quantization import STORAGES
+from src.langchain.rag_demo.semantic_chunker import SemanticChunker
+from src.langchain.rag_demo.sharded import ShardedVectorStore
+from src.langchain.rag_demo.vectorstore import ArrayVectorStore
 
 load_dotenv()
 
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE"))
 OVERLAP_SIZE = int(os.getenv("OVERLAP_SIZE"))
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME")
+# "recursive" (fixed CHUNK_SIZE) or "semantic" (sentence groups split at topic shifts)
+CHUNKER = os.getenv("CHUNKER", "recursive")
+SEMANTIC_MAX_TOKENS = int(os.getenv("SEMANTIC_MAX_TOKENS", "200"))
+# In-memory vector format: "float32", "int8" (4x smaller) or "pq" (product quantization,
+# PQ_SUBVECTORS bytes per vector; the embedding dimension must divide evenly)
+VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "float32")
+PQ_SUBVECTORS = int(os.getenv("PQ_SUBVECTORS", "96"))
+# Optional two-stage search: scan the first N dims in memory, re-rank with full vectors from disk
+SCAN_DIMENSIONS = int(os.getenv("SCAN_DIMENSIONS", "0")) or None
+FULL_VECTORS_DIR = os.getenv("FULL_VECTORS_DIR", ".rag_demo")  # each store gets its own file in here
+# Optional: hash-partition the index across this many worker processes
+SHARDS = int(os.getenv("SHARDS", "1"))
+SHARDS_DIR = os.getenv("SHARDS_DIR", ".rag_demo/shards")  # each store gets its own directory in here
+
+if VECTOR_STORAGE not in STORAGES:
+    raise ValueError(f"VECTOR_STORAGE must be one of {', '.join(STORAGES)}, got {VECTOR_STORAGE!r}")
+if SHARDS > 1 and SCAN_DIMENSIONS:
+    raise ValueError("SHARDS and SCAN_DIMENSIONS can't be combined: shard workers scan full vectors")
+if SHARDS > 1 and VECTOR_STORAGE != "float32":
+    raise ValueError("SHARDS and VECTOR_STORAGE can't be combined: shard files hold float32 vectors")
 
-def ingest_documents(raw_documents) -> InMemoryVectorStore:
+def ingest_documents(raw_documents) -> HybridStore:
     """
-    Ingest a list of raw documents into the vector store.
+    Ingest a list of raw documents into the vector store and its BM25 index.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=OVERLAP_SIZE
-    )
-
-    chunks = splitter.split_documents(raw_documents)
-
     embeddings = OpenAIEmbeddings(
         model=EMBEDDING_MODEL_NAME
     )
 
-    vectorstore = InMemoryVectorStore.from_documents(
-        documents=[],
-        embedding=embeddings
-    )
+    dedup = NearDuplicateFilter()
+    if CHUNKER == "semantic":
+        # Embeds all sentences in one batched call to find the breakpoints; the chunk
+        # vectors are built from those, so chunks are not embedded a second time
+        splitter = SemanticChunker(
+            embeddings,
+            max_tokens=SEMANTIC_MAX_TOKENS
+        )
+        chunks, vectors = dedup.filter_with_vectors(*splitter.split_documents_with_vectors(raw_documents))
+    else:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=OVERLAP_SIZE,
+            add_start_index=True  # lets MMR drop chunks that repeat an overlapping span
+        )
+        # Near-duplicate chunks (repeated boilerplate) are embedded once
+        chunks, vectors = dedup.filter(splitter.split_documents(raw_documents)), None
+
+    if SHARDS > 1:
+        vectorstore = ShardedVectorStore(
+            embeddings,
+            shards=SHARDS,
+            path=SHARDS_DIR
+        )
+        # Stops the worker processes and deletes the shard files
+        atexit.register(vectorstore.close)
+    else:
+        vectorstore = ArrayVectorStore(
+            embedding=embeddings,
+            storage=VECTOR_STORAGE,
+            storage_options={"subvectors": PQ_SUBVECTORS} if VECTOR_STORAGE == "pq" else None,
+            scan_dims=SCAN_DIMENSIONS,
+            rerank_dir=FULL_VECTORS_DIR if SCAN_DIMENSIONS else None
+        )
 
-    vectorstore.add_documents(chunks)
+    store = HybridStore(vectorstore)
+    if vectors is None:
+        store.add_documents(chunks)
+    else:
+        store.add_embeddings(chunks, vectors)
 
-    return vectorstore
\ No newline at end of file
+    return store
@@ -1,31 +1,38 @@
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableMap, RunnablePassthrough
+from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnableMap
 from langchain_openai import ChatOpenAI
 
-from document import format_docs
-from document import read_document
-from ingest import ingest_documents
+from src.langchain.rag_demo.document import format_docs
+from src.langchain.rag_demo.document import read_document
+from src.langchain.rag_demo.ingest import ingest_documents
+from src.langchain.rag_demo.query_context import QueryContext, QueryLog, SemanticCache
+from src.observability.spans import SpanCallbackHandler, default_recorder
 
 load_dotenv()
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
-document = read_document("data/Identifier+Descriptions.txt")
-vectorstore = ingest_documents([document])
-retriever = vectorstore.as_retriever(
-    search_kwargs={"k": 5}
+document = read_document(Path(__file__).parent / "data/Identifier+Descriptions.txt")
+store = ingest_documents([document])
+# Hybrid BM25 + dense retrieval; ISIN/ticker lookups are answered by BM25 without embedding the query.
+# MMR keeps the 5 chunks diverse instead of returning overlapping neighbours of the same passage.
+retriever = store.as_retriever(
+    search_type="mmr",
+    search_kwargs={"k": 5, "fetch_k": 20, "lambda_mult": 0.5}
 )
 prompt = ChatPromptTemplate.from_messages([
     ("system", "Answer using ONLY the provided context. "
                "If the answer is not in the context, say 'I don't know'."),
     ("user", "Context:\n{context}\n\nQuestion:\n{question}")
 ])
+# Both branches receive the QueryContext; the retriever searches by its (single) embedding
 inputs = RunnableMap({
-    "question": RunnablePassthrough(),
+    "question": RunnableLambda(lambda ctx: ctx.question),
     "context": (retriever
                 # | RunnableLambda(lambda docs: (print(json.dumps([{"page_content": d.page_content, "metadata": d.metadata} for d in docs], indent=2, default=str)), docs)[1])
                 | format_docs),
@@ -36,10 +43,37 @@ llm = ChatOpenAI(
     max_tokens=100
 )
 
-chain = (inputs
-         | prompt
-         | llm
-         | StrOutputParser())
+generate = (prompt
+            | llm
+            | StrOutputParser())
+
+# Paraphrases of an answered question are served from the cache; the log tracks repeats.
+# Both reuse the vector the retriever searched with, and are only consulted after retrieval
+# when that vector exists: identifier lookups answered by BM25 alone are never embedded.
+cache = SemanticCache(threshold=0.95)
+query_log = QueryLog()
+# Per-stage spans (retriever, prompt, LLM with token usage, parser) and cache hits
+spans = default_recorder()
+
+def answer(ctx: QueryContext, config: RunnableConfig) -> str:
+    retrieved = inputs.invoke(ctx, config)
+    if not ctx.embedded:
+        return generate.invoke(retrieved, config)
+    # Repeats and paraphrases are span attributes (OTLP export), not output mixed into answers
+    with spans.span("query_log") as span:
+        record = query_log.record(ctx)
+        if span is not None and record.nearest is not None:
+            span.attributes.update({"query_log.nearest": record.nearest, "query_log.similarity": record.similarity})
+    cached = cache.lookup(ctx)
+    spans.record_cache("semantic_cache", cached is not None)
+    if cached is not None:
+        return cached
+    result = generate.invoke(retrieved, config)
+    cache.put(ctx, result)
+    return result
+
+chain = (RunnableLambda(lambda question: QueryContext(question, store.vectorstore.embeddings))
+         | RunnableLambda(answer))
 
 def main():
     while True:
@@ -47,8 +81,9 @@ def main():
         if not user_question:
             print("Exiting...")
             break
-        result = chain.invoke(user_question)
+        result = chain.invoke(user_question, config={"callbacks": [SpanCallbackHandler(spans)]})
         print(result)
+    print(spans.summary())
 
 if __name__ == "__main__":
   print("----------- RAG Demo Module -----------\n\n")
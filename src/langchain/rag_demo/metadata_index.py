@@ -0,0 +1,126 @@
+"""
+Metadata filters for vector search, answered from precomputed indexes.
+
+Filters use the Mongo-style dicts common across LangChain vector stores; fields are ANDed:
+
+    {"source": "a.txt"}                          equality (same as {"$eq": ...})
+    {"source": {"$in": ["a.txt", "b.txt"]}}      set membership
+    {"chunk": {"$gte": 2, "$lt": 10}}            numeric range ($gt, $gte, $lt, $lte)
+
+`MetadataIndex` keeps an inverted index (field -> value -> row ids) for equality/$in and a
+sorted (value, row) array per numeric field for ranges, so a filter resolves to the row
+ids to score without touching the vectors. List-valued metadata (e.g. the `sources` that
+dedup collapses onto one chunk) is indexed per element.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+
+
+def _values(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _conditions(condition: Any) -> Dict[str, Any]:
+    return condition if isinstance(condition, Mapping) else {"$eq": condition}
+
+
+def matches(metadata: Mapping[str, Any], where: Mapping[str, Any]) -> bool:
+    """Evaluate a filter against one metadata dict (for stores without an index, e.g. BM25 hits)."""
+    for field, condition in where.items():
+        values = _values(metadata.get(field))
+        for op, operand in _conditions(condition).items():
+            if op == "$eq":
+                ok = operand in values
+            elif op == "$in":
+                ok = any(v in operand for v in values)
+            elif op in RANGE_OPERATORS:
+                ok = any(_is_number(v) and _compare(op, v, operand) for v in values)
+            else:
+                raise ValueError(f"unsupported filter operator: {op}")
+            if not ok:
+                return False
+    return True
+
+
+def _compare(op: str, value: float, operand: float) -> bool:
+    return {"$gt": value > operand, "$gte": value >= operand, "$lt": value < operand, "$lte": value <= operand}[op]
+
+
+class MetadataIndex:
+    def __init__(self):
+        self.size = 0
+        self._inverted: Dict[str, Dict[Any, List[int]]] = {}
+        self._numeric: Dict[str, List[Tuple[float, int]]] = {}
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # field -> (values, rows), rebuilt lazily
+
+    def add(self, metadatas: List[Mapping[str, Any]]) -> None:
+        for metadata in metadatas:
+            row = self.size
+            self.size += 1
+            for field, value in (metadata or {}).items():
+                for v in _values(value):
+                    try:
+                        self._inverted.setdefault(field, {}).setdefault(v, []).append(row)
+                    except TypeError:  # unhashable (e.g. nested dict): not filterable
+                        continue
+                    if _is_number(v):
+                        self._numeric.setdefault(field, []).append((v, row))
+                        self._sorted.pop(field, None)
+
+    def _equal_rows(self, field: str, values: List[Any]) -> np.ndarray:
+        postings = self._inverted.get(field, {})
+        rows = [postings.get(v, []) for v in values]
+        return np.unique(np.concatenate([np.asarray(r, dtype=np.int64) for r in rows])) if rows else np.empty(0, np.int64)
+
+    def _range_rows(self, field: str, ops: Dict[str, Any]) -> np.ndarray:
+        if field not in self._sorted:
+            pairs = sorted(self._numeric.get(field, []))
+            self._sorted[field] = (
+                np.array([v for v, _ in pairs], dtype=np.float64),
+                np.array([r for _, r in pairs], dtype=np.int64),
+            )
+        values, rows = self._sorted[field]
+        lo, hi = 0, len(values)
+        if "$gt" in ops:
+            lo = max(lo, int(np.searchsorted(values, ops["$gt"], side="right")))
+        if "$gte" in ops:
+            lo = max(lo, int(np.searchsorted(values, ops["$gte"], side="left")))
+        if "$lt" in ops:
+            hi = min(hi, int(np.searchsorted(values, ops["$lt"], side="left")))
+        if "$lte" in ops:
+            hi = min(hi, int(np.searchsorted(values, ops["$lte"], side="right")))
+        return np.unique(rows[lo:hi]) if lo < hi else np.empty(0, np.int64)
+
+    def rows(self, where: Optional[Mapping[str, Any]]) -> Optional[np.ndarray]:
+        """Sorted row ids matching `where`, or None when there is no filter (all rows)."""
+        if not where:
+            return None
+        result: Optional[np.ndarray] = None
+        for field, condition in where.items():
+            ops = _conditions(condition)
+            unknown = set(ops) - RANGE_OPERATORS - {"$eq", "$in"}
+            if unknown:
+                raise ValueError(f"unsupported filter operator: {sorted(unknown)[0]}")
+            parts = []
+            if "$eq" in ops:
+                parts.append(self._equal_rows(field, [ops["$eq"]]))
+            if "$in" in ops:
+                parts.append(self._equal_rows(field, list(ops["$in"])))
+            range_ops = {op: v for op, v in ops.items() if op in RANGE_OPERATORS}
+            if range_ops:
+                parts.append(self._range_rows(field, range_ops))
+            for part in parts:
+                result = part if result is None else np.intersect1d(result, part, assume_unique=True)
+            if result is not None and not len(result):
+                break
+        return result
@@ -0,0 +1,242 @@
+"""
+Compact vector storage for ArrayVectorStore.
+
+A 1536-dim embedding held as a Python list costs ~50KB (a pointer plus a float object per
+dimension). The storages here keep unit-normalized vectors as:
+
+  float32  4 bytes/dim, exact                                   (1536 dims: 6KB)
+  int8     1 byte/dim + a float32 scale per vector              (1536 dims: 1.5KB)
+  pq       product quantization, 1 byte per subvector           (1536 dims, 96 subvectors: 96B)
+
+Every storage scores all rows (or the subset a metadata filter selected) against a query
+in one vectorized pass and can reconstruct (approximate) vectors for MMR. `FullVectorFile`
+keeps the exact float32 vectors in a memory-mapped file on disk, so the top candidates of a
+quantized search can be re-ranked exactly without holding full vectors in RAM.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+class GrowableArray:
+    """Row-appendable numpy array with geometric growth (amortized O(1) appends)."""
+
+    def __init__(self, dtype, width: Optional[int] = None):
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self._data: Optional[np.ndarray] = None
+        self.size = 0
+
+    def append(self, rows: np.ndarray) -> None:
+        rows = np.asarray(rows, dtype=self.dtype)
+        if self._data is None:
+            self._data = np.empty((max(len(rows), 16),) + rows.shape[1:], dtype=self.dtype)
+        elif self.size + len(rows) > len(self._data):
+            grown = np.empty((max(2 * len(self._data), self.size + len(rows)),) + self._data.shape[1:], dtype=self.dtype)
+            grown[: self.size] = self._data[: self.size]
+            self._data = grown
+        self._data[self.size: self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    @property
+    def view(self) -> np.ndarray:
+        if self._data is None:
+            return np.empty((0,) + ((self.width,) if self.width else ()), dtype=self.dtype)
+        return self._data[: self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return self.view.nbytes
+
+
+class Float32Storage:
+    def __init__(self):
+        self._vectors = GrowableArray(np.float32)
+
+    def __len__(self) -> int:
+        return self._vectors.size
+
+    def append(self, vectors: np.ndarray) -> None:
+        self._vectors.append(vectors)
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        vectors = self._vectors.view
+        return (vectors if rows is None else vectors[rows]) @ query
+
+    def reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        return self._vectors.view[rows]
+
+    @property
+    def nbytes(self) -> int:
+        return self._vectors.nbytes
+
+
+class Int8Storage:
+    """Symmetric scalar quantization with one scale per vector: v ~ codes * scale."""
+
+    def __init__(self):
+        self._codes = GrowableArray(np.int8)
+        self._scales = GrowableArray(np.float32)
+
+    def __len__(self) -> int:
+        return self._codes.size
+
+    def append(self, vectors: np.ndarray) -> None:
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        self._codes.append(np.round(vectors / scales[:, None]).astype(np.int8))
+        self._scales.append(scales)
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None, block: int = 65_536) -> np.ndarray:
+        # Blocked, so only `block` rows are ever upcast to float32 at a time.
+        codes, scales = self._codes.view, self._scales.view
+        if rows is not None:
+            codes, scales = codes[rows], scales[rows]
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block):
+            out[start: start + block] = codes[start: start + block].astype(np.float32) @ query
+        return out * scales
+
+    def reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        return self._codes.view[rows].astype(np.float32) * self._scales.view[rows, None]
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + self._scales.nbytes
+
+
+def _kmeans(x: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+        assign = np.argmax(x @ centroids.T - 0.5 * (centroids * centroids).sum(axis=1), axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class PQStorage:
+    """
+    Product quantization: each vector is split into `subvectors` slices and every slice is
+    replaced by the id of its nearest centroid (k-means, `centroids` per slice, so one byte).
+    Query scores are sums of per-slice lookup tables (asymmetric distance computation).
+
+    Vectors are kept as exact float32 until `train_size` of them have been appended; the
+    codebooks are then trained on those vectors, everything is encoded and later appends
+    are encoded with the same codebooks. A small store therefore stays exact instead of
+    being quantized by codebooks fitted to a handful of vectors.
+    """
+
+    def __init__(self, subvectors: int = 32, centroids: int = 256, train_size: int = 20_000, iterations: int = 12, seed: int = 0):
+        if centroids > 256:
+            raise ValueError("centroids must be <= 256 to fit one byte per code")
+        self.subvectors = subvectors
+        self.centroids = centroids
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (subvectors, centroids, dim // subvectors)
+        self._codes = GrowableArray(np.uint8)
+        self._pending = GrowableArray(np.float32)  # exact vectors held until the codebooks are trained
+
+    def __len__(self) -> int:
+        return self._codes.size + self._pending.size
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        n, dim = vectors.shape
+        if dim % self.subvectors:
+            raise ValueError(f"dimension {dim} is not divisible by subvectors={self.subvectors}")
+        return vectors.reshape(n, self.subvectors, dim // self.subvectors)
+
+    def train(self, vectors: np.ndarray) -> None:
+        if len(vectors) < self.centroids:
+            raise ValueError(f"PQ training needs at least centroids={self.centroids} vectors, got {len(vectors)}")
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), self.train_size), replace=False)]
+        parts = self._split(sample)
+        self.codebooks = np.stack([_kmeans(parts[:, j], self.centroids, self.iterations, rng) for j in range(self.subvectors)])
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        parts = self._split(vectors)
+        codes = np.empty((len(vectors), self.subvectors), dtype=np.uint8)
+        for j, codebook in enumerate(self.codebooks):
+            codes[:, j] = np.argmax(parts[:, j] @ codebook.T - 0.5 * (codebook * codebook).sum(axis=1), axis=1)
+        return codes
+
+    def append(self, vectors: np.ndarray) -> None:
+        if self.codebooks is not None:
+            self._codes.append(self._encode(vectors))
+            return
+        self._split(vectors)  # reject a bad dimension now rather than at training time
+        self._pending.append(vectors)
+        if self._pending.size >= max(self.train_size, self.centroids):
+            pending = self._pending.view
+            self.train(pending)
+            self._codes.append(self._encode(pending))
+            self._pending = GrowableArray(np.float32)
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.codebooks is None:
+            pending = self._pending.view
+            return (pending if rows is None else pending[rows]) @ query
+        tables = np.einsum("jkd,jd->jk", self.codebooks, self._split(query[None, :])[0])
+        codes = self._codes.view if rows is None else self._codes.view[rows]
+        return tables[np.arange(self.subvectors), codes].sum(axis=1)
+
+    def reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        if self.codebooks is None:
+            return self._pending.view[rows]
+        codes = self._codes.view[rows]
+        parts = self.codebooks[np.arange(self.subvectors), codes]  # (rows, subvectors, sub_dim)
+        return parts.reshape(len(rows), -1)
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + self._pending.nbytes + (self.codebooks.nbytes if self.codebooks is not None else 0)
+
+
+STORAGES = {"float32": Float32Storage, "int8": Int8Storage, "pq": PQStorage}
+
+
+class FullVectorFile:
+    """
+    Append-only float32 vectors in a file, read back through a memory map (not held in RAM).
+
+    Each instance creates its own uniquely named file under `directory`, so stores built in
+    the same process or by concurrent processes never share (or truncate) one another's
+    vectors; the file is deleted when the instance is garbage collected or at exit.
+    """
+
+    def __init__(self, directory: str | Path, dim: Optional[int] = None):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix="full-", suffix=".f32", dir=directory)
+        os.close(fd)
+        self.path = Path(name)
+        self._cleanup = weakref.finalize(self, self.path.unlink, missing_ok=True)
+        self.dim = dim
+        self.size = 0
+        self._map: Optional[np.memmap] = None
+
+    def append(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.dim = vectors.shape[1]
+        with self.path.open("ab") as f:
+            f.write(vectors.tobytes())
+        self.size += len(vectors)
+        self._map = None
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        if self._map is None:
+            self._map = np.memmap(self.path, dtype=np.float32, mode="r", shape=(self.size, self.dim))
+        return np.asarray(self._map[np.sort(rows)])[np.argsort(np.argsort(rows))]
@@ -0,0 +1,116 @@
+"""
+One embedding per query, shared by everything that needs the query vector.
+
+A `QueryContext` wraps the question and embeds it lazily, at most once. It is what flows
+through the chain inputs: `HybridRetriever` accepts it in place of a string and searches
+by its vector, and the semantic cache and the query log read the same vector instead of
+embedding the question again. `cache.lookup` and `log.record` embed on demand, so check
+`ctx.embedded` after retrieval to keep queries answered from BM25 alone (identifier
+lookups) free of any embedding call:
+
+    ctx = QueryContext("What is an ISIN?", embeddings)
+    docs = retriever.invoke(ctx)
+    answer = (cache.lookup(ctx) if ctx.embedded else None) or generate(docs)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.langchain.rag_demo.vectorstore import normalize
+
+
+@dataclass
+class QueryContext:
+    question: str
+    embeddings: Embeddings
+    embed_calls: int = 0
+    _vector: Optional[np.ndarray] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def embedded(self) -> bool:
+        return self._vector is not None
+
+    @property
+    def vector(self) -> np.ndarray:
+        """The unit-normalized query embedding, computed on first use."""
+        with self._lock:  # RunnableMap branches may ask for it concurrently
+            if self._vector is None:
+                self._vector = normalize(np.asarray(self.embeddings.embed_query(self.question), dtype=np.float32))
+                self.embed_calls += 1
+            return self._vector
+
+    def __str__(self) -> str:
+        return self.question
+
+
+class SemanticCache:
+    """
+    Answers keyed by query vector: a lookup hits when a cached query has cosine similarity
+    >= `threshold`. Oldest entries are evicted beyond `maxsize`.
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 256):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries: Deque[Tuple[np.ndarray, Any]] = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, ctx: QueryContext) -> Optional[Any]:
+        vector = ctx.vector
+        with self._lock:
+            if self._entries:
+                scores = np.stack([v for v, _ in self._entries]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.hits += 1
+                    return self._entries[best][1]
+            self.misses += 1
+            return None
+
+    def put(self, ctx: QueryContext, value: Any) -> None:
+        with self._lock:
+            self._entries.append((ctx.vector, value))
+
+
+@dataclass
+class QueryRecord:
+    question: str
+    timestamp: float
+    nearest: Optional[str]  # most similar earlier question
+    similarity: float
+
+
+class QueryLog:
+    """Analytics: which earlier question each query is closest to (repeats, paraphrases)."""
+
+    def __init__(self, maxsize: int = 1000):
+        self.records: Deque[QueryRecord] = deque(maxlen=maxsize)
+        self._vectors: Deque[np.ndarray] = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+
+    def record(self, ctx: QueryContext) -> QueryRecord:
+        vector = ctx.vector
+        with self._lock:
+            nearest, similarity = None, 0.0
+            if self._vectors:
+                scores = np.stack(self._vectors) @ vector
+                best = int(np.argmax(scores))
+                nearest, similarity = self.records[best].question, float(scores[best])
+            record = QueryRecord(ctx.question, time.time(), nearest, similarity)
+            self.records.append(record)
+            self._vectors.append(vector)
+            return record
+
+    def repeats(self, threshold: float = 0.9) -> List[QueryRecord]:
+        return [r for r in self.records if r.similarity >= threshold]
@@ -0,0 +1,150 @@
+"""
+Semantic chunking: split at topic shifts instead of at fixed character counts.
+
+Fixed-size splitting cuts sentences in half and, with small sizes, produces many tiny
+chunks that each cost an embedding and a vector. `SemanticChunker` splits text into
+sentences, embeds every sentence of every document in one batched `embed_documents`
+call, and starts a new chunk where the similarity between neighbouring sentences drops
+(the distance is above the `breakpoint_percentile` of that document's distances) or
+when the next sentence would push the chunk over `max_tokens`.
+
+    chunker = SemanticChunker(embeddings, max_tokens=200)
+    chunks = chunker.split_documents(raw_documents)
+
+Chunks keep the document metadata plus `start_index`, like a splitter created with
+`add_start_index=True`. A single sentence longer than `max_tokens` becomes its own chunk.
+`split_documents_with_vectors` also returns chunk vectors built from the sentence vectors,
+so the chunks can be stored without embedding them again.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.langchain.rag_demo.vectorstore import normalize
+
+# A sentence ends at . ! or ? followed by whitespace, or directly by a capital letter
+# (text extracted from PDFs/HTML often loses the space: "...industrie.ISIN The ...").
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[a-z)][.!?])(?=[A-Z])")
+# ...unless the period belongs to a list number or initials ("1.", "U.S.", "L.P.").
+_NO_BREAK = re.compile(r"(?:^|\s)(?:\d+|[A-Z](?:\.[A-Z])*)\.$")
+
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """(start offset, sentence) pairs, whitespace-trimmed and non-empty."""
+    sentences, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        if _NO_BREAK.search(text[start: match.start()]):
+            continue
+        sentences.append((start, text[start: match.start()]))
+        start = match.end()
+    sentences.append((start, text[start:]))
+    trimmed = []
+    for offset, sentence in sentences:
+        stripped = sentence.strip()
+        if stripped:
+            trimmed.append((offset + len(sentence) - len(sentence.lstrip()), stripped))
+    return trimmed
+
+
+def _default_token_counter() -> Callable[[str], int]:
+    # Exact cl100k counts when tiktoken's encoding is available, else ~4 characters per token
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        return lambda text: max(1, len(text) // 4)
+
+
+class SemanticChunker:
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            *,
+            max_tokens: int = 200,
+            min_tokens: int = 0,
+            breakpoint_percentile: float = 75.0,
+            buffer_size: int = 1,
+            token_counter: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        `buffer_size` smooths each sentence vector with that many neighbours on each side
+        before comparing (averaging the vectors already computed, no extra calls).
+        Breakpoints are ignored while the current chunk is below `min_tokens`.
+        """
+        self.embeddings = embeddings
+        self.max_tokens = max_tokens
+        self.min_tokens = min_tokens
+        self.breakpoint_percentile = breakpoint_percentile
+        self.buffer_size = buffer_size
+        self.count_tokens = token_counter or _default_token_counter()
+
+    def _distances(self, vectors: np.ndarray) -> np.ndarray:
+        """Cosine distance between each sentence and the next (after neighbour smoothing)."""
+        if len(vectors) < 2:
+            return np.empty(0, dtype=np.float32)
+        if self.buffer_size:
+            cumulative = np.vstack([np.zeros((1, vectors.shape[1]), dtype=vectors.dtype), np.cumsum(vectors, axis=0)])
+            lo = np.maximum(np.arange(len(vectors)) - self.buffer_size, 0)
+            hi = np.minimum(np.arange(len(vectors)) + self.buffer_size + 1, len(vectors))
+            vectors = normalize(cumulative[hi] - cumulative[lo])
+        return 1.0 - np.einsum("ij,ij->i", vectors[:-1], vectors[1:])
+
+    def _group(self, sentences: Sequence[Tuple[int, str]], vectors: np.ndarray) -> List[Tuple[int, int]]:
+        """[first, last) sentence ranges of the chunks of one document."""
+        distances = self._distances(vectors)
+        threshold = np.percentile(distances, self.breakpoint_percentile) if len(distances) else np.inf
+        tokens = [self.count_tokens(sentence) for _, sentence in sentences]
+
+        groups, first, size = [], 0, tokens[0]
+        for i in range(1, len(sentences)):
+            topic_shift = distances[i - 1] > threshold and size >= self.min_tokens
+            if topic_shift or size + tokens[i] > self.max_tokens:
+                groups.append((first, i))
+                first, size = i, 0
+            size += tokens[i]
+        groups.append((first, len(sentences)))
+        return groups
+
+    def split_documents_with_vectors(self, documents: Sequence[Document]) -> Tuple[List[Document], np.ndarray]:
+        """
+        Chunks plus a vector per chunk (the normalized mean of its sentence vectors), for
+        `ArrayVectorStore.add_embeddings` when a second embedding pass over the chunks is
+        not worth its cost.
+        """
+        per_document = [split_sentences(doc.page_content) for doc in documents]
+        texts = [sentence for sentences in per_document for _, sentence in sentences]
+        if not texts:
+            return [], np.empty((0, 0), dtype=np.float32)
+        # One batched call for every sentence of every document
+        vectors = normalize(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+
+        chunks: List[Document] = []
+        chunk_vectors: List[np.ndarray] = []
+        offset = 0
+        for doc, sentences in zip(documents, per_document):
+            if not sentences:
+                continue
+            doc_vectors = vectors[offset: offset + len(sentences)]
+            offset += len(sentences)
+            for first, last in self._group(sentences, doc_vectors):
+                start = sentences[first][0]
+                end = sentences[last - 1][0] + len(sentences[last - 1][1])
+                chunks.append(Document(
+                    page_content=doc.page_content[start:end],
+                    metadata={**doc.metadata, "start_index": start},
+                ))
+                chunk_vectors.append(doc_vectors[first:last].mean(axis=0))
+        return chunks, normalize(np.stack(chunk_vectors))
+
+    def split_documents(self, documents: Sequence[Document]) -> List[Document]:
+        return self.split_documents_with_vectors(documents)[0]
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk.page_content for chunk in self.split_documents([Document(page_content=text)])]
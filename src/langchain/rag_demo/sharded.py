@@ -0,0 +1,263 @@
+"""
+A vector index hash-partitioned across worker processes.
+
+Each chunk goes to shard crc32(id) % N. A shard is an append-only float32 file; its worker
+process (one per shard) memory-maps it and scans it for every query. A query is embedded
+once in the calling process, scattered to all shards in parallel and the per-shard top-k
+lists are merged, so scan throughput scales with cores and the vectors live in the page
+cache rather than in any one process's heap. Documents stay in the calling process; workers
+only return row numbers and scores. A metadata `filter=` is resolved against the
+`MetadataIndex` in the calling process and each shard is sent the local rows it may score.
+
+Every store writes its shard files to its own fresh directory under `path` and removes it,
+along with its worker processes, on `close()` (or when used as a context manager, or at
+exit).
+
+    with ShardedVectorStore(embeddings, shards=4, path=".rag_demo/shards") as store:
+        store.add_documents(chunks)
+        retriever = store.as_retriever(search_kwargs={"k": 5})
+"""
+
+from __future__ import annotations
+
+import heapq
+import shutil
+import tempfile
+import threading
+import weakref
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from src.langchain.rag_demo.metadata_index import MetadataIndex
+from src.langchain.rag_demo.vectorstore import mmr_select, normalize
+
+# Worker-side cache: (path, rows) -> memmap, so a warm worker does not re-open its shard.
+_SHARD_MAPS: Dict[str, Tuple[int, np.memmap]] = {}
+
+
+def _shard_map(path: str, rows: int, dim: int) -> np.memmap:
+    cached = _SHARD_MAPS.get(path)
+    if cached is None or cached[0] != rows:
+        cached = _SHARD_MAPS[path] = (rows, np.memmap(path, dtype=np.float32, mode="r", shape=(rows, dim)))
+    return cached[1]
+
+
+def _search_shard(
+        path: str,
+        rows: int,
+        dim: int,
+        query: np.ndarray,
+        k: int,
+        with_vectors: bool,
+        subset: Optional[np.ndarray] = None,
+):
+    """Runs in the shard's worker process: top-k local rows (of `subset`, if given), their scores (and vectors)."""
+    if rows == 0 or (subset is not None and len(subset) == 0):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), None
+    vectors = _shard_map(path, rows, dim)
+    if subset is not None:
+        candidates = np.asarray(vectors[subset])
+        scores = candidates @ query
+        top = np.argpartition(-scores, min(k, len(subset)) - 1)[:k]
+        return subset[top], scores[top], candidates[top] if with_vectors else None
+    scores = vectors @ query
+    k = min(k, rows)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top, scores[top], np.asarray(vectors[np.sort(top)])[np.argsort(np.argsort(top))] if with_vectors else None
+
+
+def _release(workers: List[ProcessPoolExecutor], directory: Path) -> None:
+    for worker in workers:
+        worker.shutdown(wait=True, cancel_futures=True)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class ShardedVectorStore(VectorStore):
+    def __init__(self, embedding: Embeddings, *, shards: int = 4, path: str | Path = ".rag_demo/shards"):
+        self.embedding = embedding
+        Path(path).mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix="store-", dir=path))
+        self.docs: List[Document] = []
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._shard_files = [self.path / f"shard-{i:03d}.f32" for i in range(shards)]
+        self._shard_docs: List[List[int]] = [[] for _ in range(shards)]  # shard row -> position in self.docs
+        self._position_shard: List[int] = []  # position in self.docs -> shard
+        self._position_row: List[int] = []  # position in self.docs -> row within its shard
+        self.metadata_index = MetadataIndex()
+        for f in self._shard_files:
+            f.touch()
+        # One single-process pool per shard keeps each shard's memmap warm in "its" worker.
+        self._workers = [ProcessPoolExecutor(max_workers=1) for _ in range(shards)]
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _release, self._workers, self.path)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def shards(self) -> int:
+        return len(self._shard_files)
+
+    def close(self) -> None:
+        """Stop the shard workers and delete this store's shard files (idempotent)."""
+        self._finalizer()
+
+    def __enter__(self) -> "ShardedVectorStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def add_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas, ids=ids)
+
+    def add_embeddings(
+            self,
+            texts: Sequence[str],
+            embeddings: Sequence[Sequence[float]] | np.ndarray,
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectors = normalize(np.asarray(embeddings, dtype=np.float32))
+        shard_of = np.array([zlib.crc32(doc_id.encode("utf-8")) % self.shards for doc_id in ids])
+
+        with self._lock:
+            self._dim = vectors.shape[1]
+            first = len(self.docs)
+            for text, metadata, doc_id in zip(texts, metadatas, ids):
+                self._rows[doc_id] = len(self.docs)
+                self.docs.append(Document(id=doc_id, page_content=text, metadata=metadata or {}))
+            local_rows = np.empty(len(ids), dtype=np.int64)
+            for shard in range(self.shards):
+                members = np.flatnonzero(shard_of == shard)
+                if len(members):
+                    with self._shard_files[shard].open("ab") as f:
+                        f.write(np.ascontiguousarray(vectors[members]).tobytes())
+                    local_rows[members] = len(self._shard_docs[shard]) + np.arange(len(members))
+                    self._shard_docs[shard].extend(int(first + m) for m in members)
+            self._position_shard.extend(shard_of.tolist())
+            self._position_row.extend(local_rows.tolist())
+            self.metadata_index.add([metadata or {} for metadata in metadatas])
+        return ids
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        ids = kwargs.pop("ids", None) or [doc.id or str(uuid.uuid4()) for doc in documents]
+        return self.add_texts([d.page_content for d in documents], [d.metadata for d in documents], ids=ids)
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return [self.docs[self._rows[i]] for i in ids if i in self._rows]
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: List[str],
+            embedding: Embeddings,
+            metadatas: Optional[List[dict]] = None,
+            **kwargs: Any,
+    ) -> "ShardedVectorStore":
+        ids = kwargs.pop("ids", None)
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    # ------------------------------------------------------------------
+    # Scatter / gather search
+    # ------------------------------------------------------------------
+
+    def _scatter(self, query: np.ndarray, k: int, with_vectors: bool = False, where: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            snapshot = [(str(f), len(rows)) for f, rows in zip(self._shard_files, self._shard_docs)]
+            allowed = self.metadata_index.rows(where)
+            subsets: List[Optional[np.ndarray]] = [None] * self.shards
+            if allowed is not None:
+                shard_of = np.asarray(self._position_shard, dtype=np.int64)[allowed]
+                local_rows = np.asarray(self._position_row, dtype=np.int64)[allowed]
+                subsets = [local_rows[shard_of == shard] for shard in range(self.shards)]
+        futures = [
+            worker.submit(_search_shard, path, rows, self._dim or len(query), query, k, with_vectors, subset)
+            for worker, (path, rows), subset in zip(self._workers, snapshot, subsets)
+        ]
+        hits = []
+        for shard, future in enumerate(futures):
+            local_rows, scores, vectors = future.result()
+            for i, (row, score) in enumerate(zip(local_rows, scores)):
+                hits.append((float(score), self._shard_docs[shard][row], None if vectors is None else vectors[i]))
+        return heapq.nlargest(k, hits, key=lambda hit: hit[0])
+
+    def similarity_search_with_score_by_vector(
+            self,
+            embedding: Sequence[float],
+            k: int = 4,
+            filter: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        return [(self.docs[position], score) for score, position, _ in self._scatter(query, k, where=filter)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1.0) / 2.0
+
+    def max_marginal_relevance_search_by_vector(
+            self,
+            embedding: Sequence[float],
+            k: int = 4,
+            fetch_k: int = 20,
+            lambda_mult: float = 0.5,
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+    ) -> List[Document]:
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        hits = self._scatter(query, fetch_k, with_vectors=True, where=filter)
+        if not hits:
+            return []
+        docs = [self.docs[position] for _, position, _ in hits]
+        vectors = np.stack([vector for _, _, vector in hits])
+        relevance = np.array([score for score, _, _ in hits], dtype=np.float32)
+        return mmr_select(docs, vectors, relevance, k, lambda_mult, kwargs.get("max_span_overlap", 0.5))
+
+    def max_marginal_relevance_search(
+            self,
+            query: str,
+            k: int = 4,
+            fetch_k: int = 20,
+            lambda_mult: float = 0.5,
+            **kwargs: Any,
+    ) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(self.embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs)
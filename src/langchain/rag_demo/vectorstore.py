@@ -0,0 +1,285 @@
+"""
+A numpy-backed vector store with vectorized similarity and MMR search.
+
+Vectors are L2-normalized once on insert and kept in one float32 matrix (or a quantized
+int8/PQ equivalent), so cosine similarity against every chunk is a single vectorized
+pass. MMR reuses those stored vectors (only the query is embedded) and can skip chunks
+whose character span mostly repeats a chunk already selected — the text `chunk_overlap`
+duplicates. Span checks need
+`start_index` metadata, i.e. a splitter created with `add_start_index=True`.
+
+    store = ArrayVectorStore(embeddings)
+    store.add_documents(chunks)
+    retriever = store.as_retriever(search_type="mmr", search_kwargs={"k": 5, "fetch_k": 20})
+
+Searches accept `filter=` (see metadata_index.py); only matching rows are scored.
+"""
+
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from src.langchain.rag_demo.metadata_index import MetadataIndex
+from src.langchain.rag_demo.quantization import STORAGES, FullVectorFile
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def span_overlap(a: Document, b: Document) -> float:
+    """Fraction of `a`'s characters that fall inside `b`'s span of the same source (0 if unknown)."""
+    start_a, start_b = a.metadata.get("start_index"), b.metadata.get("start_index")
+    if start_a is None or start_b is None or a.metadata.get("source") != b.metadata.get("source"):
+        return 0.0
+    end_a, end_b = start_a + len(a.page_content), start_b + len(b.page_content)
+    shared = min(end_a, end_b) - max(start_a, start_b)
+    return max(shared, 0) / max(len(a.page_content), 1)
+
+
+def drop_overlapping_spans(docs: Iterable[Document], max_overlap: float = 0.5) -> List[Document]:
+    """Keep documents in order, skipping any that mostly repeat the span of one already kept."""
+    kept: List[Document] = []
+    for doc in docs:
+        if all(span_overlap(doc, other) <= max_overlap for other in kept):
+            kept.append(doc)
+    return kept
+
+
+def mmr_select(
+        docs: Sequence[Document],
+        vectors: np.ndarray,
+        relevance: np.ndarray,
+        k: int,
+        lambda_mult: float = 0.5,
+        max_span_overlap: Optional[float] = 0.5,
+) -> List[Document]:
+    """
+    Pick up to `k` of `docs` (with unit `vectors` and query `relevance`) by MMR.
+
+    Each step picks argmax(lambda * sim(query, d) - (1 - lambda) * max sim(d, selected));
+    the max-similarity-to-selected column is updated with one matrix-vector product per
+    pick instead of recomputing pairwise similarities. Candidates whose span overlaps a
+    selected chunk by more than `max_span_overlap` are skipped (None disables this).
+    """
+    redundancy = np.full(len(docs), -np.inf, dtype=np.float32)
+    available = np.ones(len(docs), dtype=bool)
+    selected: List[Document] = []
+
+    while len(selected) < k and available.any():
+        mmr = lambda_mult * relevance - (1 - lambda_mult) * np.where(np.isinf(redundancy), 0, redundancy)
+        best = int(np.argmax(np.where(available, mmr, -np.inf)))
+        available[best] = False
+        doc = docs[best]
+        if max_span_overlap is not None and any(span_overlap(doc, s) > max_span_overlap for s in selected):
+            continue
+        selected.append(doc)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return selected
+
+
+class ArrayVectorStore(VectorStore):
+    """
+    `storage` picks how vectors are held in memory: "float32" (exact), "int8" or "pq"
+    (see quantization.py; `storage_options` go to the storage class). With `rerank_dir`,
+    exact float32 vectors are also appended to a memory-mapped file of this store's own
+    in that directory (see `FullVectorFile`) and the top
+    `rerank_factor * k` candidates of every search are re-scored exactly.
+
+    `scan_dims` enables Matryoshka-style two-stage search for models trained to keep most
+    information in the leading dimensions (text-embedding-3-*): only the first `scan_dims`
+    dimensions, renormalized, are held in memory and scanned; the full vectors go to the
+    rerank file and are used to re-rank the shortlist.
+    """
+
+    def __init__(
+            self,
+            embedding: Embeddings,
+            *,
+            storage: str = "float32",
+            storage_options: Optional[Dict[str, Any]] = None,
+            rerank_dir: Optional[str | Path] = None,
+            rerank_factor: int = 4,
+            scan_dims: Optional[int] = None,
+    ):
+        if scan_dims and not rerank_dir:
+            raise ValueError("scan_dims needs rerank_dir to keep the full vectors for re-ranking")
+        self.embedding = embedding
+        self.docs: List[Document] = []
+        self._rows: Dict[str, int] = {}
+        self.storage = STORAGES[storage](**(storage_options or {}))
+        self.full_vectors = FullVectorFile(rerank_dir) if rerank_dir else None
+        self.rerank_factor = rerank_factor
+        self.scan_dims = scan_dims
+        self.metadata_index = MetadataIndex()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of vector data held in memory (the rerank file lives on disk)."""
+        return self.storage.nbytes
+
+    def add_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas, ids=ids)
+
+    def add_embeddings(
+            self,
+            texts: Sequence[str],
+            embeddings: Sequence[Sequence[float]] | np.ndarray,
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Add texts with precomputed vectors (no embedding call)."""
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectors = normalize(np.asarray(embeddings, dtype=np.float32))
+        self.storage.append(self._scan_part(vectors))
+        self.metadata_index.add(metadatas)
+        if self.full_vectors is not None:
+            self.full_vectors.append(vectors)
+        for text, metadata, doc_id in zip(texts, metadatas, ids):
+            self._rows[doc_id] = len(self.docs)
+            self.docs.append(Document(id=doc_id, page_content=text, metadata=metadata or {}))
+        return ids
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        ids = kwargs.pop("ids", None) or [doc.id or str(uuid.uuid4()) for doc in documents]
+        return self.add_texts(
+            [doc.page_content for doc in documents],
+            [doc.metadata for doc in documents],
+            ids=ids,
+            **kwargs,
+        )
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return [self.docs[self._rows[i]] for i in ids if i in self._rows]
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: List[str],
+            embedding: Embeddings,
+            metadatas: Optional[List[dict]] = None,
+            **kwargs: Any,
+    ) -> "ArrayVectorStore":
+        ids = kwargs.pop("ids", None)
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    # ------------------------------------------------------------------
+    # Similarity search
+    # ------------------------------------------------------------------
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        return normalize(np.asarray(self.embedding.embed_query(query), dtype=np.float32))
+
+    def _top_rows(self, scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        rows = np.argpartition(-scores, k - 1)[:k]
+        return rows[np.argsort(-scores[rows])]
+
+    def _scan_part(self, vectors: np.ndarray) -> np.ndarray:
+        return normalize(vectors[..., : self.scan_dims]) if self.scan_dims else vectors
+
+    def _search(self, query: np.ndarray, k: int, where: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows and their scores; approximate scores are re-ranked exactly when possible.
+        With a metadata filter only the rows the index selects are scored.
+        """
+        subset = self.metadata_index.rows(where)
+        scores = self.storage.scores(self._scan_part(query), subset)
+        if self.full_vectors is None:
+            top = self._top_rows(scores, k)
+            return (top if subset is None else subset[top]), scores[top]
+        top = self._top_rows(scores, k * self.rerank_factor)
+        rows = top if subset is None else subset[top]
+        exact = self.full_vectors.get(rows) @ query
+        order = np.argsort(-exact)[:k]
+        return rows[order], exact[order]
+
+    def _vectors_for(self, rows: np.ndarray) -> np.ndarray:
+        if self.full_vectors is not None:
+            return self.full_vectors.get(rows)
+        return self.storage.reconstruct(rows)
+
+    def similarity_search_with_score_by_vector(
+            self,
+            embedding: Sequence[float],
+            k: int = 4,
+            filter: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        if not self.docs:
+            return []
+        rows, scores = self._search(normalize(np.asarray(embedding, dtype=np.float32)), k, filter)
+        return [(self.docs[row], float(score)) for row, score in zip(rows, scores)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._query_vector(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1.0) / 2.0  # cosine similarity -> [0, 1]
+
+    # ------------------------------------------------------------------
+    # Maximal marginal relevance
+    # ------------------------------------------------------------------
+
+    def max_marginal_relevance_search_by_vector(
+            self,
+            embedding: Sequence[float],
+            k: int = 4,
+            fetch_k: int = 20,
+            lambda_mult: float = 0.5,
+            *,
+            max_span_overlap: Optional[float] = 0.5,
+            filter: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+    ) -> List[Document]:
+        """MMR (see `mmr_select`) over the `fetch_k` most similar chunks, using the stored vectors."""
+        if not self.docs:
+            return []
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        rows, relevance = self._search(query, fetch_k, filter)
+        docs = [self.docs[row] for row in rows]
+        return mmr_select(docs, self._vectors_for(rows), relevance, k, lambda_mult, max_span_overlap)
+
+    def max_marginal_relevance_search(
+            self,
+            query: str,
+            k: int = 4,
+            fetch_k: int = 20,
+            lambda_mult: float = 0.5,
+            **kwargs: Any,
+    ) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(self._query_vector(query), k, fetch_k, lambda_mult, **kwargs)
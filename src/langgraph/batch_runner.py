@@ -0,0 +1,185 @@
+"""
+Push many queries through a supervisor graph concurrently.
+
+    python -m src.langgraph.batch_runner queries.jsonl --out results.jsonl --workers 32 --llm-concurrency 8
+
+Input is JSONL (`{"id": ..., "user_query": ...}`) or plain text with one query per line.
+Graph runs execute on a thread pool; every LLM call in the lesson module goes through one
+shared semaphore, so `--llm-concurrency` bounds in-flight API requests regardless of
+`--workers`. Identical queries share one research/retriever call (see node_cache.py).
+Results are written as JSONL in completion order, followed by a throughput and per-node
+latency report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.runnables import get_config_list
+
+
+class ConcurrencyLimitedLLM:
+    """Wraps a chat model so that at most `limit` invoke calls run at once, across all threads."""
+
+    def __init__(self, llm, limit: int):
+        self.llm = llm
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def invoke(self, input, config=None, **kwargs):
+        with self._slots:
+            return self.llm.invoke(input, config, **kwargs)
+
+    def batch(self, inputs: List[Any], config=None, **kwargs):
+        if not inputs:
+            return []
+        configs = get_config_list(config, len(inputs))
+        with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+            return list(pool.map(lambda i_c: self.invoke(i_c[0], i_c[1], **kwargs), zip(inputs, configs)))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class BatchReport:
+    runs: int = 0
+    errors: int = 0
+    wall_time: float = 0.0
+    run_latency: List[float] = field(default_factory=list)
+    node_latency: Dict[str, List[float]] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.runs} runs ({self.errors} errors) in {self.wall_time:.2f}s "
+            f"-> {self.runs / self.wall_time if self.wall_time else 0.0:.2f} queries/s"
+        ]
+        rows = [("run", self.run_latency)] + sorted(self.node_latency.items())
+        lines.append(f"{'stage':<12} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, samples in rows:
+            if samples:
+                lines.append(
+                    f"{name:<12} {len(samples):>6} {statistics.median(samples):>8.3f} "
+                    f"{percentile(samples, 0.95):>8.3f} {percentile(samples, 0.99):>8.3f}"
+                )
+        return "\n".join(lines)
+
+
+def run_one(app, inputs: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, List[float]]]:
+    """Run the graph once; the graph's nodes run one after another, so each node's latency is
+    the time between its update and the previous one."""
+    state = dict(inputs)
+    timings: Dict[str, List[float]] = {}
+    last = time.perf_counter()
+    for chunk in app.stream(inputs, stream_mode="updates"):
+        now = time.perf_counter()
+        for node, update in chunk.items():
+            timings.setdefault(node, []).append(now - last)
+            state.update(update or {})
+        last = now
+    return state, timings
+
+
+def run_batch(
+        app,
+        queries: Iterable[Dict[str, Any]],
+        *,
+        defaults: Optional[Dict[str, Any]] = None,
+        workers: int = 16,
+        on_result: Callable[[Dict[str, Any]], None] = lambda record: None,
+) -> BatchReport:
+    """Run every query through `app` on `workers` threads, calling `on_result` as each finishes."""
+    report = BatchReport()
+
+    def job(query: Dict[str, Any]):
+        start = time.perf_counter()
+        inputs = {**(defaults or {}), "user_query": query["user_query"]}
+        try:
+            state, timings = run_one(app, inputs)
+            error = None
+        except Exception as e:
+            state, timings, error = inputs, {}, f"{type(e).__name__}: {e}"
+        return query, state, timings, error, time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(job, query) for query in queries]
+        for future in as_completed(futures):
+            query, state, timings, error, elapsed = future.result()
+            report.runs += 1
+            report.errors += error is not None
+            report.run_latency.append(elapsed)
+            for node, samples in timings.items():
+                report.node_latency.setdefault(node, []).extend(samples)
+            on_result({
+                "id": query.get("id"),
+                "user_query": query["user_query"],
+                "final_answer": state.get("final_answer"),
+                "validation_feedback": state.get("validation_feedback"),
+                "retry_count": state.get("retry_count"),
+                "latency_s": round(elapsed, 4),
+                "error": error,
+            })
+    report.wall_time = time.perf_counter() - started
+    return report
+
+
+def read_queries(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            query = json.loads(line) if line.startswith("{") else {"user_query": line}
+            query.setdefault("id", n)
+            yield query
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", type=Path, help="JSONL with user_query fields, or one query per line")
+    parser.add_argument("--out", type=Path, default=Path("batch_results.jsonl"))
+    parser.add_argument("--lesson", default="src.langgraph.lesson9_tool_usage", help="module exposing build_graph() and llm")
+    parser.add_argument("--workers", type=int, default=16, help="graph runs in flight")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="LLM requests in flight across all runs")
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--verbose", action="store_true", help="keep the lesson's per-step state printing")
+    args = parser.parse_args()
+
+    lesson = importlib.import_module(args.lesson)
+    lesson.llm = ConcurrencyLimitedLLM(lesson.llm, args.llm_concurrency)
+    if not args.verbose and hasattr(lesson, "print_state"):
+        lesson.print_state = lambda state: None
+    app = lesson.build_graph()
+
+    with args.out.open("w", encoding="utf-8") as out:
+        def write(record: Dict[str, Any]) -> None:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        report = run_batch(
+            app,
+            read_queries(args.queries),
+            defaults={"retry_count": 0, "max_retries": args.max_retries},
+            workers=args.workers,
+            on_result=write,
+        )
+
+    print(report.summary())
+    print(f"results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
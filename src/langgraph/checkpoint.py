@@ -0,0 +1,321 @@
+"""
+Persistent, resumable checkpoints for the supervisor graphs.
+
+`SqliteCheckpointSaver` stores each channel value once per *version*: after a node runs,
+only the channels it changed get a new blob, the rest of the checkpoint just points at the
+versions already on disk. Large blobs are zlib-compressed. That keeps a
+research -> reasoning -> validation run to a few small rows per step.
+
+`resume_or_start()` re-enters a thread at the last completed node, so a crash in
+validation does not repeat the research/draft LLM calls that already finished. Every
+checkpoint records a fingerprint of the run's inputs, so reusing a thread id with
+different inputs is an error rather than a silent replay of the old answer.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+COMPRESS_OVER = 512  # bytes
+RUN_INPUTS_KEY = "run_inputs"  # checkpoint metadata: fingerprint of the inputs the thread started from
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    parent_id TEXT, type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL,
+    type TEXT NOT NULL, blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT, blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+def _pack(typed: Tuple[str, bytes]) -> Tuple[str, bytes]:
+    type_, data = typed
+    if len(data) > COMPRESS_OVER:
+        return f"z:{type_}", zlib.compress(data)
+    return type_, data
+
+
+def _unpack(type_: str, data: bytes) -> Tuple[str, bytes]:
+    if type_.startswith("z:"):
+        return type_[2:], zlib.decompress(data)
+    return type_, data
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """LangGraph checkpointer backed by a local SQLite file (WAL mode, one connection per thread)."""
+
+    def __init__(self, path: str | Path, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -------- serialization helpers --------
+    def _dumps(self, value: Any) -> Tuple[str, bytes]:
+        return _pack(self.serde.dumps_typed(value))
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        return self.serde.loads_typed(_unpack(type_, data))
+
+    # -------- reads --------
+    def _load_channel_values(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        conn = self._conn()
+        for channel, version in versions.items():
+            row = conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            values[channel] = self._loads(*row)
+        return values
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list:
+        rows = self._conn().execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self._loads(type_, blob)) for task_id, channel, type_, blob in rows]
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint: Checkpoint = self._loads(type_, checkpoint_blob)
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_channel_values(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self._loads(metadata_type, metadata_blob),
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id,
+                }}
+                if parent_id else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata"
+        if checkpoint_id := get_checkpoint_id(config):
+            row = self._conn().execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = self._conn().execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return self._tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+            self,
+            config: Optional[RunnableConfig],
+            *,
+            filter: Optional[Dict[str, Any]] = None,
+            before: Optional[RunnableConfig] = None,
+            limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints"
+        where, params = [], []
+        if config:
+            where.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns=?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id=?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id<?")
+            params.append(before_id)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+
+        for thread_id, checkpoint_ns, *row in self._conn().execute(query, params).fetchall():
+            tup = self._tuple(thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(tup.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield tup
+
+    # -------- writes --------
+    def put(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        c = checkpoint.copy()
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+
+        conn = self._conn()
+        with conn:
+            # Delta encoding: only channels that changed in this step are written.
+            conn.executemany(
+                "INSERT OR IGNORE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (thread_id, checkpoint_ns, channel, str(version),
+                     *(self._dumps(values[channel]) if channel in values else ("empty", None)))
+                    for channel, version in new_versions.items()
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 *self._dumps(c), *self._dumps(get_checkpoint_metadata(config, metadata))),
+            )
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(
+            self,
+            config: RunnableConfig,
+            writes: Sequence[Tuple[str, Any]],
+            task_id: str,
+            task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+             channel, *self._dumps(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        conn = self._conn()
+        with conn:
+            # Special channels (errors, interrupts...) have negative idx and overwrite;
+            # regular task writes are idempotent.
+            conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [row for row in rows if row[4] < 0])
+            conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [row for row in rows if row[4] >= 0])
+
+    def delete_thread(self, thread_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            for table in ("checkpoints", "blobs", "writes"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id=?", (thread_id,))
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        # Same scheme as InMemorySaver: zero-padded counter, sortable as text.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # -------- async (the graphs here are sync; delegate) --------
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for tup in self.list(config, filter=filter, before=before, limit=limit):
+            yield tup
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+
+def thread_config(thread_id: str, inputs: Dict[str, Any]) -> RunnableConfig:
+    """Run config for a checkpointed thread; its checkpoints carry a fingerprint of `inputs`."""
+    fingerprint = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    return {"configurable": {"thread_id": thread_id}, "metadata": {RUN_INPUTS_KEY: fingerprint}}
+
+
+def thread_state(app, config: RunnableConfig):
+    """The thread's current snapshot; raises if it was started from different inputs."""
+    snapshot = app.get_state(config)
+    if snapshot.values and snapshot.metadata.get(RUN_INPUTS_KEY) != config["metadata"][RUN_INPUTS_KEY]:
+        raise ValueError(
+            f"thread {config['configurable']['thread_id']!r} was started with different inputs; "
+            "use a new thread id (unset LANGGRAPH_THREAD_ID) to run new inputs"
+        )
+    return snapshot
+
+
+def resume_or_start(app, inputs: Dict[str, Any], *, thread_id: str) -> Dict[str, Any]:
+    """
+    Run `app` on a checkpointed thread.
+
+    - new thread: start from `inputs`
+    - interrupted thread (crash, Ctrl-C): continue from the last completed node
+    - finished thread: return the stored final state without calling any LLM
+    - thread started from other inputs: ValueError
+    """
+    config = thread_config(thread_id, inputs)
+    snapshot = thread_state(app, config)
+    if snapshot.next:
+        return app.invoke(None, config)
+    if snapshot.values:
+        return snapshot.values
+    return app.invoke(inputs, config)
@@ -1,3 +1,4 @@
+import uuid
 from typing import TypedDict, Optional
 
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -5,7 +6,9 @@ from langchain_openai import ChatOpenAI
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 
-from src.config import OPENAI_MODEL
+from src.config import LANGGRAPH_CHECKPOINT_DB, LANGGRAPH_STREAM, LANGGRAPH_THREAD_ID, OPENAI_MODEL
+from src.langgraph.checkpoint import SqliteCheckpointSaver, resume_or_start
+from src.langgraph.streaming import print_stream
 
 llm = ChatOpenAI(
     model=OPENAI_MODEL,
@@ -104,8 +107,7 @@ def supervisor_node(state: AgentState) -> dict:
     return {"next_step": "end"}
 
 
-def main():
-    print("Hello from lesson 6! This is where we'll implement the graph node class.")
+def build_graph(checkpointer=None):
     graph = StateGraph(AgentState)
 
     graph.add_node("supervisor", supervisor_node)
@@ -130,9 +132,23 @@ def main():
     graph.add_edge("reasoning", "supervisor")
     graph.add_edge("validation", "supervisor")
 
-    app = graph.compile()
-    result = app.invoke({
+    return graph.compile(checkpointer=checkpointer)
+
+
+def main():
+    print("Hello from lesson 6! This is where we'll implement the graph node class.")
+    # Checkpoint after every node so a crashed run resumes without repeating finished LLM calls.
+    app = build_graph(checkpointer=SqliteCheckpointSaver(LANGGRAPH_CHECKPOINT_DB))
+    thread_id = LANGGRAPH_THREAD_ID or str(uuid.uuid4())
+    print(f"thread_id: {thread_id} (set LANGGRAPH_THREAD_ID to resume this run)")
+
+    inputs = {
         "user_query": "Explain how CRISPR gene editing works"
-    })
+    }
 
-    print(result["final_answer"])
+    if LANGGRAPH_STREAM:
+        # Progress per node and draft tokens as they arrive instead of one blocking invoke.
+        result = print_stream(app, inputs, thread_id=thread_id)
+    else:
+        result = resume_or_start(app, inputs, thread_id=thread_id)
+        print(result["final_answer"])
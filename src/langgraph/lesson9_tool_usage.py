@@ -1,17 +1,38 @@
+import uuid
 from typing import TypedDict
 
-from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
+from langgraph.config import get_config
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 
-from src.config import OPENAI_MODEL
-from src.langgraph.retriever import retriever
+from src.config import EMBEDDING_MODEL_NAME, LANGGRAPH_CHECKPOINT_DB, LANGGRAPH_NODE_CACHE_DB, LANGGRAPH_STREAM, LANGGRAPH_THREAD_ID, OPENAI_MODEL
+from src.langgraph.checkpoint import SqliteCheckpointSaver, resume_or_start
+from src.langgraph.node_cache import cached_node
+from src.langgraph.prevalidation import PreValidator
+from src.langgraph.reasoners import REASONERS, drafts_to_generate, judge_messages, judge_pick, judge_redo, reasoner_messages
+from src.langgraph.retriever import corpus_version, get_embeddings, get_retriever
+from src.langgraph.streaming import print_stream
+from src.observability.ledger import LedgerCallbackHandler, default_ledger
+from src.observability.spans import SpanCallbackHandler, default_recorder, traced_node
+
+# Node spans (with cache hits) and LLM spans with token usage go to default_recorder(),
+# created on the first span rather than at import; see src/observability/spans.py
+
+# Ledger stage per LLM call: the reasoners (told apart by their batch tag) and the judge.
+# Research is a retriever call here, and the pre-validator's embeddings are recorded in
+# embed_drafts; see src/observability/ledger.py
+PIPELINE_STAGES = {
+    "draft_answer_a": "reasoner_a",
+    "draft_answer_b": "reasoner_b",
+    "validation": "judge",
+}
+LEDGER = default_ledger()
 
 llm = ChatOpenAI(
     model=OPENAI_MODEL,
     temperature=0.2
-)
+).with_config(callbacks=[SpanCallbackHandler(), LedgerCallbackHandler(LEDGER, stage_names=PIPELINE_STAGES)])
 
 
 class AgentState(TypedDict):
@@ -27,9 +48,14 @@ class AgentState(TypedDict):
     retry_count: int
     max_retries: int
 
+    # Draft keys the validator rejected; the next reasoning pass regenerates only these.
+    redo_drafts: list[str]
 
+
+# Popular queries skip straight to reasoning; a new model/corpus version misses the cache.
+@cached_node(fields=("user_query",), version=corpus_version, disk_path=LANGGRAPH_NODE_CACHE_DB)
 def research_node(state: AgentState) -> dict:
-    docs = retriever.invoke(state["user_query"])
+    docs = get_retriever().invoke(state["user_query"])
 
     notes = "\n".join(doc.page_content for doc in docs)
 
@@ -39,79 +65,91 @@ def research_node(state: AgentState) -> dict:
 
 
 def reasoning_node_a(state: AgentState) -> dict:
-    response = llm.invoke([
-        SystemMessage(
-            content="You are Reasoner A. Produce a clear, structured answer."
-        ),
-        HumanMessage(
-            content=f"Research:\n{state['research_notes']}\n\nQuestion:\n{state['user_query']}"
-        )
-    ])
+    response = llm.invoke(reasoner_messages(state, "draft_answer_a"))
     return {"draft_answer_a": response.content}
 
 def reasoning_node_b(state: AgentState) -> dict:
-    response = llm.invoke([
-        SystemMessage(
-            content="You are Reasoner B. Provide an alternative reasoning approach."
-        ),
-        HumanMessage(
-            content=f"Research:\n{state['research_notes']}\n\nQuestion:\n{state['user_query']}"
-        )
-    ])
+    response = llm.invoke(reasoner_messages(state, "draft_answer_b"))
     return {"draft_answer_b": response.content}
 
 
 def reasoning_node(state: AgentState) -> dict:
-    # print(f"Supervisor state: {state}")
-    # print("----------------------------------")
-
-    """Composite reasoning node that runs both Reasoner A and Reasoner B.
+    """Composite reasoning node that runs Reasoner A and Reasoner B concurrently.
 
     This keeps the supervisor logic unchanged (it can still route to the
     "reasoning" node) while ensuring both drafts are produced for validation.
-    Reasoners must run independently (no sharing of each other's drafts).
+    Reasoners must run independently (no sharing of each other's drafts), so
+    both prompts go out in one `llm.batch` call and the node takes as long as
+    the slower reasoner instead of the sum of both. On a retry only the
+    drafts that need replacing are regenerated.
     """
-    # Run Reasoner A (does NOT expose its draft to Reasoner B)
-    out_a = reasoning_node_a(state)
+    draft_keys = drafts_to_generate(state)
 
-    # Run Reasoner B with the original state only — do NOT merge out_a into the state
-    out_b = reasoning_node_b(state)
+    # Each reasoner only sees the original state — never the other reasoner's draft
+    # Tag each call with its draft key so streamed tokens can be told apart.
+    responses = llm.batch(
+        [reasoner_messages(state, key) for key in draft_keys],
+        config=[{"tags": [key], "max_concurrency": len(draft_keys)} for key in draft_keys],
+    )
 
     # Return combined outputs so the graph state contains both drafts for the validator
-    return {**out_a, **out_b}
+    return {
+        **{key: response.content for key, response in zip(draft_keys, responses)},
+        "redo_drafts": [],
+    }
+
+
+def _thread_id() -> str:
+    """The running graph's thread id; "default" outside a graph run (benchmarks, tests)."""
+    try:
+        return str(get_config().get("configurable", {}).get("thread_id") or "default")
+    except RuntimeError:
+        return "default"
+
+
+def embed_drafts(texts: list[str]) -> list[list[float]]:
+    # Embedding calls bypass the ledger's callback handler, so bill them to this run's thread here
+    LEDGER.record_texts(EMBEDDING_MODEL_NAME, texts, stage="prevalidator", session=_thread_id())
+    return get_embeddings().embed_documents(texts)
+
+
+# Deterministic checks decide the easy cases so the LLM judge only sees close calls.
+PREVALIDATOR = PreValidator(embed=embed_drafts)
 
 
 def validation_node(state: AgentState) -> dict:
     # print(f"Supervisor state: {state}")
     # print("----------------------------------")
 
-    # Ask the judge to explicitly pick A, B, or REJECT for easier parsing
-    response = llm.invoke([
-        SystemMessage(
-            content=(
-                "You are a strict judge. Compare Answer A and Answer B. "
-                "Reply with exactly one of: 'A' if Answer A is better, 'B' if Answer B is better, "
-                "or 'REJECT' if neither is acceptable. After that, you may give a brief justification."
-            )
-        ),
-        HumanMessage(
-            content=(
-                f"Answer A:\n{state.get('draft_answer_a', '')}\n\n"
-                f"Answer B:\n{state.get('draft_answer_b', '')}"
-            )
-        )
-    ])
-
-    verdict_raw = response.content.strip()
-    verdict = verdict_raw.lower()
-
-    if "reject" in verdict:
+    verdict = PREVALIDATOR.check(
+        {key: state.get(key, "") for key in REASONERS},
+        state.get("research_notes", ""),
+        new_run=state.get("retry_count", 0) == 0,
+    )
+    if verdict.decision == "accept":
+        return {
+            "final_answer": state[verdict.winner],
+            "validation_feedback": f"PRE-VALIDATION: {verdict.reason}",
+        }
+    if verdict.decision == "reject":
+        return {
+            "validation_feedback": f"PRE-VALIDATION REJECT: {verdict.reason}",
+            "redo_drafts": verdict.redo,
+        }
+
+    response = llm.invoke(judge_messages(state))
+
+    # The judge names the weaker draft, so a retry regenerates only that one
+    redo = judge_redo(response.content)
+    if redo is not None:
         return {
-            "validation_feedback": response.content
+            "validation_feedback": response.content,
+            "redo_drafts": redo,
         }
 
+    # Same output as a pre-validation accept: the winning draft, with the verdict as feedback
     return {
-        "final_answer": response.content,
+        "final_answer": state[judge_pick(response.content)],
         "validation_feedback": response.content
     }
 
@@ -137,15 +175,14 @@ def supervisor_node(state: AgentState) -> dict:
 
 
 
-def main():
-    print("Hello from lesson 6! This is where we'll implement the graph node class.")
+def build_graph(checkpointer=None):
     graph = StateGraph(AgentState)
 
-    graph.add_node("supervisor", supervisor_node)
-    graph.add_node("research", research_node)
+    graph.add_node("supervisor", traced_node(name="supervisor")(supervisor_node))
+    graph.add_node("research", traced_node(name="research")(research_node))
     # keep the single "reasoning" node name but wire it to the composite that runs both A and B
-    graph.add_node("reasoning", reasoning_node)
-    graph.add_node("validation", validation_node)
+    graph.add_node("reasoning", traced_node(name="reasoning")(reasoning_node))
+    graph.add_node("validation", traced_node(name="validation")(validation_node))
 
     graph.set_entry_point("supervisor")
 
@@ -164,14 +201,34 @@ def main():
     graph.add_edge("validation", "supervisor")
     graph.add_edge("reasoning", "validation")
 
-    app = graph.compile()
-    result = app.invoke({
+    return graph.compile(checkpointer=checkpointer)
+
+
+def main():
+    print("Hello from lesson 6! This is where we'll implement the graph node class.")
+    # Checkpoint after every node so a crashed run resumes without repeating finished LLM calls.
+    app = build_graph(checkpointer=SqliteCheckpointSaver(LANGGRAPH_CHECKPOINT_DB))
+    thread_id = LANGGRAPH_THREAD_ID or str(uuid.uuid4())
+    print(f"thread_id: {thread_id} (set LANGGRAPH_THREAD_ID to resume this run)")
+
+    inputs = {
         "user_query": "Explain how CRISPR gene editing works",
         "retry_count": 0,
         "max_retries": 2,
-    })
+    }
 
-    print(result["final_answer"])
+    # One trace per run: node and LLM spans nest under it
+    spans = default_recorder()
+    with spans.span("lesson9_run"):
+        if LANGGRAPH_STREAM:
+            # Progress per node and draft tokens as they arrive instead of one blocking invoke.
+            result = print_stream(app, inputs, thread_id=thread_id, draft_keys=REASONERS)
+        else:
+            result = resume_or_start(app, inputs, thread_id=thread_id)
+            print(result["final_answer"])
+    print(PREVALIDATOR.report())
+    print(spans.summary())
+    print(LEDGER.report(by=("stage", "model")))
 
 def print_state(state: AgentState):
     print(f"Current state: "
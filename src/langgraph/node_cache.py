@@ -0,0 +1,167 @@
+"""
+Result memoization for LangGraph nodes.
+
+    @cached_node(fields=("user_query",), version=lambda: CORPUS_VERSION)
+    def research_node(state): ...
+
+The cache key is the node name, the `version()` string and the selected input fields, so
+changing the model or the retriever corpus invalidates old entries automatically. Entries
+live in a bounded in-process LRU and, optionally, in a SQLite file shared across runs
+(opened on the first lookup, not when the decorator runs). Concurrent calls with the same
+key (e.g. a batch of runs asking the same question) share a single execution of the node.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+
+def normalize_value(value: Any) -> Any:
+    # "Explain  CRISPR " and "Explain CRISPR" are the same question.
+    return " ".join(value.split()) if isinstance(value, str) else value
+
+
+class NodeCache:
+    """Thread-safe LRU with an optional SQLite second level."""
+
+    def __init__(self, maxsize: int = 256, disk_path: str | Path | None = None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lru: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._disk_path = Path(disk_path) if disk_path else None
+        self._local = threading.local()
+        self._disk_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                if not self._disk_ready:
+                    self._disk_path.parent.mkdir(parents=True, exist_ok=True)
+                    with sqlite3.connect(self._disk_path, timeout=30.0) as setup:
+                        setup.execute("PRAGMA journal_mode=WAL")
+                        setup.execute("CREATE TABLE IF NOT EXISTS node_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                    setup.close()
+                    self._disk_ready = True
+            conn = sqlite3.connect(self._disk_path, timeout=30.0)
+            self._local.conn = conn
+        return conn
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                return value
+
+        if self._disk_path:
+            row = self._conn().execute("SELECT value FROM node_cache WHERE key=?", (key,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self._remember(key, value)
+                return value
+        return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._lookup(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        self._remember(key, value)
+        if self._disk_path:
+            conn = self._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO node_cache VALUES (?, ?)", (key, json.dumps(value)))
+
+    def single_flight(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Compute and store `key` once; concurrent callers for the same key wait for that result."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            # A leader that finished between our cache miss and now has already stored it
+            value = self._lookup(key)
+            if value is not None:
+                future.set_result(value)
+                return value
+            value = compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+        if self._disk_path:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM node_cache")
+
+
+def cached_node(
+        fields: Sequence[str],
+        *,
+        version: Callable[[], str] = lambda: "",
+        maxsize: int = 256,
+        disk_path: str | Path | None = None,
+):
+    """Memoize a node's state update on `fields` of its input state (outputs must be JSON-serializable)."""
+
+    def decorator(node: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        cache = NodeCache(maxsize=maxsize, disk_path=disk_path)
+        last = threading.local()
+        # Module-qualified, so same-named nodes of different lessons sharing a disk cache never collide
+        node_id = f"{node.__module__}.{node.__qualname__}"
+
+        @wraps(node)
+        def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+            inputs = {field: normalize_value(state.get(field)) for field in fields}
+            raw = json.dumps([node_id, version(), inputs], sort_keys=True, default=str)
+            key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+            update = cache.get(key)
+            last.hit = update is not None
+            if update is None:
+                update = cache.single_flight(key, lambda: node(state))
+            return dict(update)
+
+        wrapper.cache = cache
+        # Whether this thread's last call was served from the cache (for tracing)
+        wrapper.cache_hit = lambda: getattr(last, "hit", False)
+        return wrapper
+
+    return decorator
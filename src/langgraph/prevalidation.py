@@ -0,0 +1,113 @@
+"""
+Cheap, deterministic checks that run before the LLM judge in `validation_node`.
+
+Most validation passes are easy calls: a draft is empty, a draft ignores the research
+notes entirely, or both drafts say the same thing. Those are decided locally; only the
+genuinely close cases go to the judge.
+
+    verdict = PREVALIDATOR.check({"draft_answer_a": a, "draft_answer_b": b}, notes, new_run=True)
+    if verdict.decision == "judge": ...   # fall through to the LLM judge
+
+`embed` is optional: pass e.g. `OpenAIEmbeddings().embed_documents` to compare drafts by
+embedding similarity; without it a bag-of-words cosine is used (no network call).
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Literal, Optional, Sequence
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can for from has have how in is it its of on or that the "
+    "their then there these this to was were what when which who why will with you your".split()
+)
+
+
+def content_words(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2]
+
+
+def grounding(draft: str, notes: str) -> float:
+    """Fraction of the draft's distinct content words that appear in the research notes."""
+    words = set(content_words(draft))
+    if not words:
+        return 0.0
+    return len(words & set(content_words(notes))) / len(words)
+
+
+def _cosine(u: Sequence[float], v: Sequence[float]) -> float:
+    dot = sum(a * b for a, b in zip(u, v))
+    norm = math.sqrt(sum(a * a for a in u)) * math.sqrt(sum(b * b for b in v))
+    return dot / norm if norm else 0.0
+
+
+def lexical_similarity(a: str, b: str) -> float:
+    ca, cb = Counter(content_words(a)), Counter(content_words(b))
+    keys = list(ca.keys() | cb.keys())
+    return _cosine([ca[k] for k in keys], [cb[k] for k in keys])
+
+
+@dataclass
+class PreValidation:
+    decision: Literal["accept", "reject", "judge"]
+    winner: Optional[str] = None  # draft key when decision == "accept"
+    redo: List[str] = field(default_factory=list)  # draft keys to regenerate when decision == "reject"
+    reason: str = ""
+
+
+@dataclass
+class PreValidator:
+    min_grounding: float = 0.2  # below this a draft is treated as ignoring the research notes
+    win_margin: float = 0.4  # grounding lead that counts as a clear win
+    agree_similarity: float = 0.9  # drafts this similar agree; the better grounded one wins
+    embed: Optional[Callable[[List[str]], List[List[float]]]] = None
+
+    runs: int = 0
+    checks: int = 0
+    judge_calls_saved: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def similarity(self, a: str, b: str) -> float:
+        if self.embed is None:
+            return lexical_similarity(a, b)
+        u, v = self.embed([a, b])
+        return _cosine(u, v)
+
+    def check(self, drafts: Dict[str, str], notes: str, *, new_run: bool = False) -> PreValidation:
+        verdict = self._decide(drafts, notes)
+        with self._lock:
+            self.runs += int(new_run)
+            self.checks += 1
+            self.judge_calls_saved += int(verdict.decision != "judge")
+        return verdict
+
+    def _decide(self, drafts: Dict[str, str], notes: str) -> PreValidation:
+        scores = {key: grounding(text or "", notes) for key, text in drafts.items()}
+        bad = [key for key, text in drafts.items() if not (text or "").strip() or scores[key] < self.min_grounding]
+
+        if len(bad) == len(drafts):
+            return PreValidation("reject", redo=bad, reason="no draft is grounded in the research notes")
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        best, runner_up = ranked[0], ranked[1] if len(ranked) > 1 else None
+
+        if runner_up is None or runner_up in bad:
+            return PreValidation("accept", winner=best, reason=f"only {best} is grounded in the research notes")
+        if scores[best] - scores[runner_up] >= self.win_margin:
+            return PreValidation("accept", winner=best, reason=f"{best} is far better grounded")
+        if self.similarity(drafts[best], drafts[runner_up]) >= self.agree_similarity:
+            return PreValidation("accept", winner=best, reason="drafts agree")
+
+        return PreValidation("judge")
+
+    def report(self) -> str:
+        per_1k = 1000 * self.judge_calls_saved / self.runs if self.runs else 0.0
+        return (
+            f"pre-validation: {self.judge_calls_saved}/{self.checks} passes decided without the judge "
+            f"({per_1k:.0f} judge calls saved per 1k runs)"
+        )
@@ -0,0 +1,85 @@
+"""
+The two reasoners and the judge shared by the supervisor lessons (7 and 9).
+
+The reasoning node drafts one answer per key in `REASONERS`; `drafts_to_generate` says
+which drafts a pass has to (re)write, so a retry only replaces the drafts that were
+rejected. Rejections come from the pre-validator (`PreValidation.redo`) or from the
+judge, whose reply names the weaker draft:
+
+    response = llm.invoke(judge_messages(state))
+    redo = judge_redo(response.content)   # None: accepted; else draft keys to regenerate
+    winner = judge_pick(response.content)  # draft key of the accepted answer
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, List, Mapping, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+REASONERS = {
+    "draft_answer_a": "You are Reasoner A. Produce a clear, structured answer.",
+    "draft_answer_b": "You are Reasoner B. Provide an alternative reasoning approach.",
+}
+
+JUDGE_LABELS = {"A": "draft_answer_a", "B": "draft_answer_b"}
+
+_REJECT = re.compile(r"\breject\b(?:\s+(a|b|both)\b)?", re.IGNORECASE)
+# Upper case only, so the article "a" in a justification is not read as a pick
+_PICK = re.compile(r"\b([AB])\b")
+
+
+def reasoner_messages(state: Mapping[str, Any], draft_key: str) -> list:
+    return [
+        SystemMessage(
+            content=REASONERS[draft_key]
+        ),
+        HumanMessage(
+            content=f"Research:\n{state['research_notes']}\n\nQuestion:\n{state['user_query']}"
+        )
+    ]
+
+
+def drafts_to_generate(state: Mapping[str, Any]) -> list[str]:
+    """Missing drafts plus the ones the validator asked to replace (both, if it didn't say)."""
+    missing = [key for key in REASONERS if not state.get(key)]
+    if missing:
+        return sorted(set(missing) | set(state.get("redo_drafts") or []))
+    return list(state.get("redo_drafts") or REASONERS)
+
+
+def judge_messages(state: Mapping[str, Any]) -> list:
+    # Ask the judge to explicitly pick A, B, or REJECT (naming the weaker draft) for easier parsing
+    return [
+        SystemMessage(
+            content=(
+                "You are a strict judge. Compare Answer A and Answer B. "
+                "Reply with exactly one of: 'A' if Answer A is better, 'B' if Answer B is better, "
+                "'REJECT A' or 'REJECT B' if neither is acceptable, naming the weaker answer to be "
+                "rewritten, or 'REJECT BOTH' if both must be rewritten. "
+                "After that, you may give a brief justification."
+            )
+        ),
+        HumanMessage(
+            content=(
+                f"Answer A:\n{state.get('draft_answer_a', '')}\n\n"
+                f"Answer B:\n{state.get('draft_answer_b', '')}"
+            )
+        )
+    ]
+
+
+def judge_redo(reply: str) -> Optional[List[str]]:
+    """None if the judge accepted a draft, else the draft keys to regenerate (both if unnamed)."""
+    match = _REJECT.search(reply)
+    if match is None:
+        return None
+    named = (match.group(1) or "both").upper()
+    return [JUDGE_LABELS[named]] if named in JUDGE_LABELS else list(REASONERS)
+
+
+def judge_pick(reply: str) -> str:
+    """Draft key the judge accepted (the first A/B label in its reply; Answer A if it names none)."""
+    match = _PICK.search(reply)
+    return JUDGE_LABELS[match.group(1)] if match else next(iter(REASONERS))
@@ -1,36 +1,130 @@
+"""
+Process-wide registry of retriever corpora for the LangGraph lessons.
+
+Nothing is embedded at import time. The first `get_retriever(name)` call in a process
+builds that corpus's vector store and BM25 index (or loads them from LANGGRAPH_INDEX_DIR)
+and every graph shares the result afterwards:
+
+    docs = get_retriever().invoke("How does CRISPR work?")
+
+Persisted indexes are named after `corpus_version(name)`, a fingerprint of the documents,
+chunking and embedding model, so a changed corpus is rebuilt instead of loaded stale.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Dict, List
+
 from langchain_core.documents import Document
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.langchain.rag_demo.ingest import EMBEDDING_MODEL_NAME
+from src.config import EMBEDDING_MODEL_NAME, LANGGRAPH_INDEX_DIR
+from src.langchain.rag_demo.bm25 import BM25Index, HybridRetriever, HybridStore
+from src.langchain.rag_demo.dedup import NearDuplicateFilter
+
+
+@dataclass(frozen=True)
+class Corpus:
+    name: str
+    documents: List[Document] = field(hash=False)
+    chunk_size: int = 25
+    chunk_overlap: int = 5
+    k: int = 3
+
+    @cached_property  # the research node's cache key asks for it on every call
+    def version(self) -> str:
+        raw = json.dumps(
+            [
+                EMBEDDING_MODEL_NAME,
+                self.chunk_size,
+                self.chunk_overlap,
+                [(d.page_content, d.metadata) for d in self.documents],
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+CORPORA: Dict[str, Corpus] = {}
+_retrievers: Dict[str, HybridRetriever] = {}
+_build_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
 
-raw_docs = [
-    Document(
-        page_content=
-                 "CRISPR is a gene-editing technology."
-                 "CRISPR allows targeted modifications of DNA."
-                 "CRISPR originated from bacterial immune systems.",
-        metadata={"source": "crispr.txt"}
+def register_corpus(corpus: Corpus) -> None:
+    """Add or replace a corpus; a replaced corpus is rebuilt on its next `get_retriever` call."""
+    with _registry_lock:
+        CORPORA[corpus.name] = corpus
+        _retrievers.pop(corpus.name, None)
+
+
+register_corpus(Corpus(
+    name="crispr",
+    documents=[
+        Document(
+            page_content=
+                     "CRISPR is a gene-editing technology."
+                     "CRISPR allows targeted modifications of DNA."
+                     "CRISPR originated from bacterial immune systems.",
+            metadata={"source": "crispr.txt"}
+        )
+    ],
+))
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL_NAME)
+
+
+def corpus_version(name: str = "crispr") -> str:
+    return CORPORA[name].version
+
+
+def _build_store(corpus: Corpus) -> HybridStore:
+    index_path = Path(LANGGRAPH_INDEX_DIR) / f"{corpus.name}-{corpus.version}.json" if LANGGRAPH_INDEX_DIR else None
+    if index_path is not None and index_path.exists():
+        vectorstore = InMemoryVectorStore.load(str(index_path), embedding=get_embeddings())
+        # BM25 is cheap to rebuild from the stored chunks, so only the embeddings are persisted.
+        bm25 = BM25Index()
+        bm25.add_documents(vectorstore.get_by_ids(list(vectorstore.store)))
+        return HybridStore(vectorstore, bm25)
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=corpus.chunk_size,
+        chunk_overlap=corpus.chunk_overlap
     )
-]
 
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=25,
-    chunk_overlap=5
-)
+    store = HybridStore(InMemoryVectorStore(embedding=get_embeddings()))
+    store.add_documents(NearDuplicateFilter().filter(splitter.split_documents(corpus.documents)))
+
+    if index_path is not None:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        store.vectorstore.dump(str(index_path))
+    return store
 
-chunks = splitter.split_documents(raw_docs)
 
-embeddings = OpenAIEmbeddings(
-    model=EMBEDDING_MODEL_NAME
-)
+def get_retriever(name: str = "crispr") -> HybridRetriever:
+    retriever = _retrievers.get(name)
+    if retriever is not None:
+        return retriever
 
-vectorstore = InMemoryVectorStore.from_documents(
-    documents=chunks,
-    embedding=embeddings
-)
+    with _registry_lock:
+        corpus = CORPORA[name]
+        lock = _build_locks.setdefault(name, threading.Lock())
 
-retriever = vectorstore.as_retriever(
-    search_kwargs={"k": 3}
-)
\ No newline at end of file
+    # Per-corpus lock: concurrent first callers wait for one build instead of each embedding.
+    with lock:
+        retriever = _retrievers.get(name)
+        if retriever is None:
+            retriever = _build_store(corpus).as_retriever(
+                search_kwargs={"k": corpus.k}
+            )
+            _retrievers[name] = retriever
+        return retriever
@@ -0,0 +1,112 @@
+"""
+Streaming run mode for the supervisor graphs.
+
+`app.invoke` only returns after research, both reasoners and the judge have finished.
+`stream_run` yields as the graph executes instead:
+
+    StreamEvent("node", "research", {...})            # a node finished, with its state update
+    StreamEvent("token", "draft_answer_a", "CRISPR")  # an LLM token from a streamed node
+    StreamEvent("final", None, {...})                 # the final graph state
+
+Tokens come from LangGraph's "messages" stream mode; reasoner calls are tagged with their
+draft key, so callers can tell the drafts apart. The winning draft is only known once the
+validator has run, so `print_stream` shows one draft live and prints the winner in full at
+the end if a different one was chosen.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+from src.langgraph.checkpoint import thread_config, thread_state
+
+
+@dataclass
+class StreamEvent:
+    kind: str  # "node" | "token" | "final"
+    key: Optional[str]  # node name for "node", draft key (or node name) for "token"
+    data: Any
+
+
+def stream_run(
+        app,
+        inputs: Dict[str, Any],
+        *,
+        thread_id: Optional[str] = None,
+        token_nodes: Iterable[str] = ("reasoning",),
+        draft_keys: Iterable[str] = (),
+) -> Iterator[StreamEvent]:
+    """
+    Run `app` and yield node updates and LLM tokens as they are produced.
+
+    With `thread_id` on a checkpointed graph this resumes like `resume_or_start`: an
+    interrupted thread continues from its last completed node, a finished one only
+    yields its stored final state, and one started from other inputs raises ValueError.
+    """
+    token_nodes, draft_keys = set(token_nodes), list(draft_keys)
+    config = thread_config(thread_id, inputs) if thread_id else {}
+
+    if thread_id:
+        snapshot = thread_state(app, config)
+        if snapshot.next:
+            inputs = None
+        elif snapshot.values:
+            yield StreamEvent("final", None, snapshot.values)
+            return
+
+    for mode, chunk in app.stream(inputs, config, stream_mode=["updates", "messages"]):
+        if mode == "updates":
+            for node, update in chunk.items():
+                yield StreamEvent("node", node, update)
+            continue
+
+        message, metadata = chunk
+        node = metadata.get("langgraph_node")
+        if node not in token_nodes or not message.content:
+            continue
+        tags = metadata.get("tags") or []
+        key = next((k for k in draft_keys if k in tags), node)
+        yield StreamEvent("token", key, message.content)
+
+    yield StreamEvent("final", None, app.get_state(config).values if thread_id else None)
+
+
+def print_stream(
+        app,
+        inputs: Dict[str, Any],
+        *,
+        thread_id: Optional[str] = None,
+        draft_keys: Iterable[str] = (),
+        out: TextIO = sys.stdout,
+) -> Dict[str, Any]:
+    """Print node progress and the first draft's tokens live; return the final state."""
+    draft_keys = list(draft_keys)
+    live = draft_keys[0] if draft_keys else "reasoning"
+    state: Dict[str, Any] = dict(inputs)
+    streaming = False
+
+    for event in stream_run(app, inputs, thread_id=thread_id, draft_keys=draft_keys):
+        if event.kind == "token":
+            if event.key == live:
+                out.write(event.data)
+                out.flush()
+                streaming = True
+            continue
+
+        if streaming:
+            out.write("\n")
+            streaming = False
+
+        if event.kind == "node" and event.data:
+            state.update(event.data)
+            out.write(f"[{event.key}] done ({', '.join(event.data)})\n")
+        elif event.kind == "final" and event.data is not None:
+            state = dict(event.data)
+        out.flush()
+
+    final_answer = state.get("final_answer")
+    if final_answer and final_answer != state.get(live):
+        out.write(f"\nFinal answer:\n{final_answer}\n")
+    return state
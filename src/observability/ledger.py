@@ -0,0 +1,250 @@
+"""
+Token and cost accounting per session, model and pipeline stage.
+
+    ledger = default_ledger()
+    ledger.record_usage("gpt-4o-mini", resp.usage, stage="extractor", session=user_id)
+    for key, totals in ledger.top_consumers(by="stage", n=3):
+        print(key, totals.cost)
+
+Costs come from `PRICES` (USD per 1M input/output tokens; dated snapshots such as
+"gpt-4o-mini-2024-07-18" use their base model's price). Models without a price are still
+counted, with cost 0, and listed by `unpriced`. `LedgerCallbackHandler` records LangChain
+model calls; in a LangGraph run the stage is the node name (or a call tag), mapped through
+`stage_names`, and the session is the thread id. Embedding calls report no usage through
+LangChain, so `record_texts` bills the texts sent to an embedding model by their token count.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import threading
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.config import USAGE_LEDGER_FILE
+from src.observability.telemetry import usage_tokens
+
+# USD per 1M tokens: (input, output)
+PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+DIMENSIONS = ("session", "model", "stage")
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """cl100k tokens (the embedding models' tokenizer) when tiktoken is available, else ~4 characters per token."""
+    encoding = _encoding()
+    return len(encoding.encode(text)) if encoding else max(1, len(text) // 4)
+
+
+@dataclass
+class Totals:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: "Totals") -> None:
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cost += other.cost
+
+
+class UsageLedger:
+    def __init__(self, prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.prices = dict(PRICES if prices is None else prices)
+        self.unpriced: set = set()
+        self._rows: Dict[Tuple[str, str, str], Totals] = {}  # (session, model, stage) -> totals
+        self._lock = threading.Lock()
+
+    def price(self, model: str) -> Optional[Tuple[float, float]]:
+        """Price of `model`, or of the longest known model name it starts with."""
+        if model in self.prices:
+            return self.prices[model]
+        base = max((name for name in self.prices if model.startswith(name + "-")), key=len, default=None)
+        return self.prices[base] if base else None
+
+    def record(
+            self,
+            model: str,
+            *,
+            input_tokens: int,
+            output_tokens: int = 0,
+            stage: str = "default",
+            session: str = "default",
+    ) -> float:
+        """Add one call; returns its cost in USD."""
+        price = self.price(model)
+        cost = (input_tokens * price[0] + output_tokens * price[1]) / 1e6 if price else 0.0
+        with self._lock:
+            if price is None:
+                self.unpriced.add(model)
+            self._rows.setdefault((session, model, stage), Totals()).add(
+                Totals(calls=1, input_tokens=input_tokens, output_tokens=output_tokens, cost=cost)
+            )
+        return cost
+
+    def record_texts(self, model: str, texts: Iterable[str], *, stage: str = "default", session: str = "default") -> float:
+        """`record` one embedding request from the texts it sends (input tokens only)."""
+        return self.record(model, input_tokens=sum(count_tokens(t) for t in texts), stage=stage, session=session)
+
+    def record_usage(self, model: str, usage: Any, *, stage: str = "default", session: str = "default") -> float:
+        """`record` from an OpenAI usage object or a LangChain usage_metadata dict."""
+        tokens = usage_tokens(usage)
+        return self.record(
+            model,
+            input_tokens=tokens.get("input_tokens", 0),
+            output_tokens=tokens.get("output_tokens", 0),
+            stage=stage,
+            session=session,
+        )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def totals(self, by: str | Sequence[str] = ()) -> Dict[Tuple[str, ...], Totals]:
+        """Totals grouped by one or more of "session", "model", "stage" (() for the grand total)."""
+        dims = (by,) if isinstance(by, str) else tuple(by)
+        unknown = set(dims) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"unknown dimension: {sorted(unknown)[0]} (use {', '.join(DIMENSIONS)})")
+        positions = [DIMENSIONS.index(d) for d in dims]
+        grouped: Dict[Tuple[str, ...], Totals] = {}
+        with self._lock:
+            for row_key, row in self._rows.items():
+                grouped.setdefault(tuple(row_key[p] for p in positions), Totals()).add(row)
+        return grouped
+
+    def top_consumers(
+            self,
+            by: str | Sequence[str] = "stage",
+            *,
+            metric: str = "cost",
+            n: int = 5,
+    ) -> List[Tuple[Tuple[str, ...], Totals]]:
+        """The `n` largest groups by `metric` ("cost", "tokens", "input_tokens", "output_tokens" or "calls")."""
+        return sorted(self.totals(by).items(), key=lambda item: getattr(item[1], metric), reverse=True)[:n]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One dict per (session, model, stage), for dashboards."""
+        with self._lock:
+            return [
+                {**dict(zip(DIMENSIONS, key)), **asdict(totals)}
+                for key, totals in sorted(self._rows.items())
+            ]
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.rows(), indent=2), encoding="utf-8")
+
+    def report(self, by: Iterable[str] = ("stage", "model", "session"), n: int = 5) -> str:
+        grand = self.totals().get((), Totals())
+        lines = [f"total: {grand.calls} calls, {grand.input_tokens}/{grand.output_tokens} tokens in/out, ${grand.cost:.4f}"]
+        for dim in by:
+            lines.append(f"top {dim}s by cost:")
+            for key, totals in self.top_consumers(dim, n=n):
+                lines.append(f"  {'/'.join(key):<28} {totals.calls:>5} calls {totals.tokens:>9} tokens  ${totals.cost:.4f}")
+        if self.unpriced:
+            lines.append(f"no price for: {', '.join(sorted(self.unpriced))} (counted at $0)")
+        return "\n".join(lines)
+
+
+class LedgerCallbackHandler(BaseCallbackHandler):
+    """
+    Records every chat model / LLM call into a ledger. The stage is the first call tag or
+    LangGraph node found in `stage_names` (mapped to its value), else the node name, else
+    `stage`; the session is the run's thread_id, else `session`.
+    """
+
+    def __init__(
+            self,
+            ledger: UsageLedger,
+            *,
+            stage: str = "default",
+            session: str = "default",
+            stage_names: Optional[Dict[str, str]] = None,
+    ):
+        self.ledger = ledger
+        self.stage = stage
+        self.session = session
+        self.stage_names = stage_names or {}
+        self._runs: Dict[UUID, Tuple[str, str, str]] = {}  # run_id -> (model, stage, session)
+        self._lock = threading.Lock()
+
+    def _resolve_stage(self, tags: Optional[List[str]], metadata: Dict[str, Any]) -> str:
+        node = metadata.get("langgraph_node")
+        for candidate in [*(tags or []), node]:
+            if candidate in self.stage_names:
+                return self.stage_names[candidate]
+        return node or self.stage
+
+    def _start(self, run_id: UUID, kwargs: Dict[str, Any]) -> None:
+        metadata = kwargs.get("metadata") or {}
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or "unknown"
+        stage = self._resolve_stage(kwargs.get("tags"), metadata)
+        session = str(metadata.get("thread_id") or self.session)
+        with self._lock:
+            self._runs[run_id] = (model, stage, session)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        with self._lock:
+            model, stage, session = self._runs.pop(run_id, ("unknown", self.stage, self.session))
+        usage: Any = (response.llm_output or {}).get("token_usage")
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if getattr(message, "usage_metadata", None):
+                    usage = message.usage_metadata
+                    model = message.response_metadata.get("model_name") or model
+        if usage:
+            self.ledger.record_usage(model, usage, stage=stage, session=session)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+
+@lru_cache(maxsize=None)
+def default_ledger() -> UsageLedger:
+    """The process-wide ledger; saved to USAGE_LEDGER_FILE (src/config.py) at exit when set."""
+    ledger = UsageLedger()
+    if USAGE_LEDGER_FILE:
+        atexit.register(ledger.save, USAGE_LEDGER_FILE)
+    return ledger
@@ -0,0 +1,437 @@
+"""
+Timing spans for LangChain runnables and LangGraph nodes.
+
+    recorder = SpanRecorder(sample_rate=0.1, otlp_path=".observability/spans.jsonl")
+    chain.invoke(question, config={"callbacks": [SpanCallbackHandler(recorder)]})
+
+    graph.add_node("research", traced_node(recorder)(research_node))
+
+Both take the recorder to use; without one they use `default_recorder()`, created on the
+first span rather than at import (it may start the Prometheus endpoint).
+
+    with recorder.span("chat_turn"):
+        ...
+
+`SpanCallbackHandler` turns callback events (chains, chat models, retrievers, tools) into
+spans with durations, token usage and errors; `traced_node` does the same for graph nodes
+(and notes whether a `cached_node` was a cache hit), and `record_cache` counts hits and
+misses of any other cache. Spans nest: callback runs use their parent run, everything else
+the span active in the current context.
+
+Sampling is decided once per trace (at the root span) so a trace is either complete or
+absent; unsampled traces allocate nothing. Finished spans are buffered and appended to
+`otlp_path` as OTLP/JSON (one ExportTraceServiceRequest per line, loadable by an
+OpenTelemetry collector's file receiver), and aggregated into Prometheus text exposition
+format (`prometheus_text()`, or `serve_prometheus(port)` for a /metrics endpoint).
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.config import OBSERVABILITY_OTLP_FILE, OBSERVABILITY_PROMETHEUS_PORT, OBSERVABILITY_SAMPLE_RATE
+
+# Histogram buckets for span durations, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# The active span, _UNSAMPLED inside a trace that was not sampled, None outside any trace
+_UNSAMPLED = object()
+_current_span: contextvars.ContextVar[Any] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # chain | llm | retriever | tool | node
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 3 if self.kind == "llm" else 1,  # CLIENT for model calls, else INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in {"span.kind": self.kind, **self.attributes}.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+@dataclass
+class _Aggregate:
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class SpanRecorder:
+    def __init__(
+            self,
+            *,
+            sample_rate: float = 1.0,
+            otlp_path: str | Path | None = None,
+            service_name: str = "openapi-tutorial",
+            buffer_size: int = 512,
+    ):
+        self.sample_rate = sample_rate
+        self.otlp_path = Path(otlp_path) if otlp_path else None
+        self.service_name = service_name
+        self.buffer_size = buffer_size
+        self.finished: Deque[Span] = deque(maxlen=10_000)  # recent spans, for inspection
+        self._pending: List[Span] = []
+        self._aggregates: Dict[Tuple[str, str], _Aggregate] = {}
+        self._cache: Dict[Tuple[str, str], int] = {}  # (cache, "hit" | "miss") -> count
+        self._lock = threading.Lock()
+        if self.otlp_path:
+            atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def start(self, name: str, kind: str, parent: Optional[Span] = None) -> Optional[Span]:
+        """A started span, or None when its trace is not sampled (root spans decide)."""
+        if parent is None:
+            parent = _current_span.get()
+            if parent is _UNSAMPLED:
+                return None
+        if parent is None and random.random() >= self.sample_rate:
+            return None
+        return Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+        )
+
+    def finish(self, span: Optional[Span], error: Optional[BaseException] = None, **attributes: Any) -> None:
+        if span is None:
+            return
+        span.end_ns = time.time_ns()
+        span.attributes.update(attributes)
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            aggregate = self._aggregates.setdefault((span.kind, span.name), _Aggregate())
+            aggregate.count += 1
+            aggregate.errors += span.error is not None
+            aggregate.seconds += span.duration
+            for i, bound in enumerate(BUCKETS):
+                if span.duration <= bound:
+                    aggregate.buckets[i] += 1
+                    break
+            aggregate.input_tokens += int(span.attributes.get("llm.usage.input_tokens", 0))
+            aggregate.output_tokens += int(span.attributes.get("llm.usage.output_tokens", 0))
+            self.finished.append(span)
+            if self.otlp_path:
+                self._pending.append(span)
+                flush = len(self._pending) >= self.buffer_size
+            else:
+                flush = False
+        if flush:
+            self.flush()
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count a cache lookup and note it on the current span, if any."""
+        with self._lock:
+            key = (cache, "hit" if hit else "miss")
+            self._cache[key] = self._cache.get(key, 0) + 1
+        span = _current_span.get()
+        if isinstance(span, Span):
+            span.attributes[f"cache.{cache}.hit"] = hit
+
+    @contextmanager
+    def span(self, name: str, kind: str = "chain") -> Iterator[Optional[Span]]:
+        """Time the block as a span (None when unsampled) that is the parent of spans started inside it."""
+        span = self.start(name, kind)
+        token = self.activate(span)
+        try:
+            yield span
+        except BaseException as exc:
+            self.finish(span, exc)
+            raise
+        else:
+            self.finish(span)
+        finally:
+            self.deactivate(token)
+
+    def activate(self, span: Optional[Span]) -> contextvars.Token:
+        """Make `span` the parent of spans started in this context (None: keep the trace unsampled)."""
+        return _current_span.set(span if span is not None else _UNSAMPLED)
+
+    def deactivate(self, token: contextvars.Token) -> None:
+        _current_span.reset(token)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Append buffered spans to `otlp_path` as one OTLP/JSON line."""
+        with self._lock:
+            spans, self._pending = self._pending, []
+        if not spans or not self.otlp_path:
+            return
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "src.observability.spans"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+        self.otlp_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.otlp_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(request) + "\n")
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            aggregates = {key: (a.count, a.errors, a.seconds, list(a.buckets), a.input_tokens, a.output_tokens)
+                          for key, a in self._aggregates.items()}
+            cache = dict(self._cache)
+        lines = [
+            "# HELP span_duration_seconds Duration of sampled spans.",
+            "# TYPE span_duration_seconds histogram",
+        ]
+        for (kind, name), (count, _, seconds, buckets, _, _) in sorted(aggregates.items()):
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'span_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'span_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"span_duration_seconds_sum{{{labels}}} {seconds:.6f}")
+            lines.append(f"span_duration_seconds_count{{{labels}}} {count}")
+        lines += ["# HELP span_errors_total Sampled spans that ended in an error.", "# TYPE span_errors_total counter"]
+        for (kind, name), (_, errors, *_rest) in sorted(aggregates.items()):
+            lines.append(f'span_errors_total{{kind="{kind}",name="{_escape(name)}"}} {errors}')
+        lines += ["# HELP llm_tokens_total Tokens reported by sampled model calls.", "# TYPE llm_tokens_total counter"]
+        for (kind, name), (*_rest, input_tokens, output_tokens) in sorted(aggregates.items()):
+            if input_tokens or output_tokens:
+                lines.append(f'llm_tokens_total{{name="{_escape(name)}",direction="input"}} {input_tokens}')
+                lines.append(f'llm_tokens_total{{name="{_escape(name)}",direction="output"}} {output_tokens}')
+        lines += ["# HELP cache_requests_total Cache lookups by result.", "# TYPE cache_requests_total counter"]
+        for (name, result), n in sorted(cache.items()):
+            lines.append(f'cache_requests_total{{cache="{_escape(name)}",result="{result}"}} {n}')
+        lines += ["# HELP span_sample_rate Share of traces recorded.", "# TYPE span_sample_rate gauge",
+                  f"span_sample_rate {self.sample_rate}"]
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve `prometheus_text()` at http://host:port/metrics from a daemon thread."""
+        recorder = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def summary(self) -> str:
+        with self._lock:
+            rows = sorted(self._aggregates.items(), key=lambda item: -item[1].seconds)
+            cache = dict(self._cache)
+        lines = [f"{'span':<32} {'n':>5} {'avg ms':>8} {'errors':>6} {'tokens in/out':>14}"]
+        for (kind, name), a in rows:
+            label = f"{kind}:{name}"[:32]
+            lines.append(f"{label:<32} {a.count:>5} {1000 * a.seconds / a.count:>8.1f} {a.errors:>6} "
+                         f"{f'{a.input_tokens}/{a.output_tokens}':>14}")
+        for name in sorted({name for name, _ in cache}):
+            hits, misses = cache.get((name, "hit"), 0), cache.get((name, "miss"), 0)
+            lines.append(f"cache {name}: {hits} hits / {hits + misses} lookups")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ----------------------------------------------------------------------
+# LangChain callback handler
+# ----------------------------------------------------------------------
+
+def _usage(response: LLMResult) -> Dict[str, int]:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"llm.usage.input_tokens": usage.get("input_tokens", 0),
+                        "llm.usage.output_tokens": usage.get("output_tokens", 0)}
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return {"llm.usage.input_tokens": usage.get("prompt_tokens", 0),
+                "llm.usage.output_tokens": usage.get("completion_tokens", 0)}
+    return {}
+
+
+class SpanCallbackHandler(BaseCallbackHandler):
+    """Records a span per callback run (chain, chat model/LLM, retriever, tool)."""
+
+    def __init__(self, recorder: Optional[SpanRecorder] = None):
+        self._recorder = recorder
+        self._runs: Dict[UUID, Optional[Span]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recorder(self) -> SpanRecorder:
+        if self._recorder is None:
+            self._recorder = default_recorder()
+        return self._recorder
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: str, **attributes: Any) -> None:
+        with self._lock:
+            if parent_run_id is not None and parent_run_id in self._runs:
+                parent = self._runs[parent_run_id]
+                span = None if parent is None else self.recorder.start(name, kind, parent=parent)
+            else:
+                span = self.recorder.start(name, kind)
+            if span is not None:
+                span.attributes.update(attributes)
+            self._runs[run_id] = span
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        with self._lock:
+            span = self._runs.pop(run_id, None)
+        self.recorder.finish(span, error, **attributes)
+
+    @staticmethod
+    def _name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any], default: str) -> str:
+        if kwargs.get("name"):
+            return kwargs["name"]
+        serialized = serialized or {}
+        return serialized.get("name") or (serialized.get("id") or [default])[-1]
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "chain"), "chain")
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or ""
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "chat_model"), "llm", **{"llm.model": model})
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "llm"), "llm")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id, **_usage(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_retriever_start(self, serialized, query, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "retriever"), "retriever")
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        self._end(run_id, **{"retriever.documents": len(documents)})
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "tool"), "tool")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+# ----------------------------------------------------------------------
+# LangGraph node wrapper
+# ----------------------------------------------------------------------
+
+def traced_node(recorder: Optional[SpanRecorder] = None, name: Optional[str] = None, kind: str = "node"):
+    """
+    Wrap a node (state -> update) in a span that records the updated keys and, for
+    `cached_node` functions, whether the result came from the cache. Without a `recorder`
+    the node records into `default_recorder()`, looked up when it first runs.
+    """
+
+    def decorator(node: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        span_name = name or node.__name__
+
+        @wraps(node)
+        def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+            spans = recorder if recorder is not None else default_recorder()
+            with spans.span(span_name, kind) as span:
+                update = node(state)
+                if hasattr(node, "cache_hit"):
+                    spans.record_cache(span_name, node.cache_hit())
+                if span is not None:
+                    span.attributes["node.updated"] = ",".join(sorted(update or {}))
+            return update
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def default_recorder() -> SpanRecorder:
+    """The process-wide recorder configured by the OBSERVABILITY_* settings in src/config.py."""
+    recorder = SpanRecorder(sample_rate=OBSERVABILITY_SAMPLE_RATE, otlp_path=OBSERVABILITY_OTLP_FILE or None)
+    if OBSERVABILITY_PROMETHEUS_PORT:
+        recorder.serve_prometheus(OBSERVABILITY_PROMETHEUS_PORT)
+    return recorder
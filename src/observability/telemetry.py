@@ -0,0 +1,224 @@
+"""
+Per-call LLM telemetry without I/O on the calling thread.
+
+    telemetry = default_telemetry()
+    with telemetry.call("gpt-4o-mini") as call:
+        call.response = client.responses.create(...)
+        data = json.loads(call.response.output_text)
+    print(telemetry.summary())
+
+`call()` records the attempt however it ends: a raised exception (API error, invalid JSON)
+is counted under its type name, with the response's token usage if there was one.
+`record_call()` records a call timed elsewhere.
+
+`record` only appends the event to a bounded deque (a single atomic operation, no lock;
+when the buffer is full the oldest events are dropped and counted). A daemon thread
+drains it every `flush_interval` seconds, folds the events into per-model aggregates
+(calls, errors by type, input/output tokens, latency histogram) and appends them to
+`path` as JSON lines in one write per batch. `stats()` and `summary()` drain first, so
+they include everything recorded so far.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from src.config import TELEMETRY_FILE
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+
+def usage_tokens(usage: Any) -> Dict[str, int]:
+    """Token counts from an OpenAI usage object (Responses or Chat Completions) or dict."""
+    if usage is None:
+        return {}
+    get = usage.get if isinstance(usage, dict) else lambda key: getattr(usage, key, None)
+    input_tokens = get("input_tokens") or get("prompt_tokens") or 0
+    output_tokens = get("output_tokens") or get("completion_tokens") or 0
+    return {"input_tokens": int(input_tokens), "output_tokens": int(output_tokens)}
+
+
+@dataclass
+class ModelStats:
+    calls: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def add(self, event: Dict[str, Any]) -> None:
+        self.calls += 1
+        if event.get("error"):
+            self.errors[event["error"]] = self.errors.get(event["error"], 0) + 1
+        self.input_tokens += event.get("input_tokens", 0)
+        self.output_tokens += event.get("output_tokens", 0)
+        latency = event.get("latency", 0.0)
+        self.latency_seconds += latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_buckets[i] += 1
+                break
+
+    def latency_percentile(self, q: float) -> float:
+        """Upper bound of the histogram bucket holding the q-th quantile."""
+        target, seen = q * self.calls, 0
+        for bound, n in zip(LATENCY_BUCKETS, self.latency_buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+
+@dataclass
+class ModelCall:
+    """Handle yielded by `Telemetry.call`: set `response` once the API returns."""
+    response: Any = None
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+class Telemetry:
+    def __init__(
+            self,
+            path: str | Path | None = None,
+            *,
+            capacity: int = 10_000,
+            flush_interval: float = 1.0,
+    ):
+        self.path = Path(path) if path else None
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.models: Dict[str, ModelStats] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._drain_lock = threading.Lock()  # only the draining side locks
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+
+    def record(self, event: Dict[str, Any]) -> None:
+        if len(self._events) == self.capacity:
+            self.dropped += 1  # approximate under contention; deque drops the oldest event
+        self._events.append(event)
+
+    def record_call(
+            self,
+            model: str,
+            *,
+            latency: float,
+            usage: Any = None,
+            error: Optional[BaseException | str] = None,
+            **fields: Any,
+    ) -> None:
+        """One model call: `usage` is the API's usage object, `error` the exception if it failed."""
+        event = {"ts": time.time(), "model": model, "latency": latency, **usage_tokens(usage), **fields}
+        if error is not None:
+            event["error"] = error if isinstance(error, str) else type(error).__name__
+        self.record(event)
+
+    @contextmanager
+    def call(self, model: str, **fields: Any) -> Iterator[ModelCall]:
+        """Time the block and record it as one call of `model`, failed if it raises."""
+        call = ModelCall(fields=dict(fields))
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            yield call
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            response = call.response
+            if response is not None:
+                call.fields.setdefault("response_id", getattr(response, "id", None))
+                call.fields.setdefault("request_id", getattr(response, "_request_id", None))
+            self.record_call(
+                model,
+                latency=time.perf_counter() - started,
+                usage=getattr(response, "usage", None),
+                error=error,
+                **call.fields,
+            )
+
+    # ------------------------------------------------------------------
+    # Background side
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Drain the buffer into the aggregates and append the batch to `path`."""
+        with self._drain_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._events.popleft())
+                except IndexError:
+                    break
+            if not batch:
+                return
+            for event in batch:
+                self.models.setdefault(event.get("model", "unknown"), ModelStats()).add(event)
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(event, default=str) + "\n" for event in batch))
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        self.flush()
+        with self._drain_lock:
+            return {
+                model: {
+                    "calls": s.calls,
+                    "errors": dict(s.errors),
+                    "input_tokens": s.input_tokens,
+                    "output_tokens": s.output_tokens,
+                    "latency_avg": s.latency_seconds / s.calls if s.calls else 0.0,
+                    "latency_p50_le": s.latency_percentile(0.5),
+                    "latency_p95_le": s.latency_percentile(0.95),
+                }
+                for model, s in self.models.items()
+            }
+
+    def summary(self) -> str:
+        lines = [f"{'model':<28} {'calls':>6} {'errors':>6} {'tokens in/out':>15} {'avg s':>7} {'p95 <=':>7}"]
+        for model, s in sorted(self.stats().items()):
+            tokens = f"{s['input_tokens']}/{s['output_tokens']}"
+            lines.append(
+                f"{model[:28]:<28} {s['calls']:>6} {sum(s['errors'].values()):>6} {tokens:>15} "
+                f"{s['latency_avg']:>7.2f} {s['latency_p95_le']:>7}"
+            )
+        if self.dropped:
+            lines.append(f"({self.dropped} events dropped: buffer full)")
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def default_telemetry() -> Telemetry:
+    """The process-wide sink, writing to TELEMETRY_FILE from src/config.py ("" keeps it in memory)."""
+    return Telemetry(TELEMETRY_FILE or None)
@@ -12,9 +12,15 @@ from openai import (
   InternalServerError,
 )
 
+from src.observability.ledger import default_ledger
+from src.observability.telemetry import default_telemetry
+
 RETRYABLE = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
 
 CLIENT = OpenAI(timeout=30.0, max_retries=0)
+MODEL = "gpt-4o-mini-2024-07-18"
+TELEMETRY = default_telemetry()
+LEDGER = default_ledger()
 
 
 EXTRACTION_SCHEMA: Dict[str, Any] = {
@@ -31,7 +37,7 @@ EXTRACTION_SCHEMA: Dict[str, Any] = {
 }
 
 
-def extract_ticket(text: str, *, max_attempts: int = 3) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+def extract_ticket(text: str, *, max_attempts: int = 3, session: str = "default") -> Tuple[Dict[str, Any], Dict[str, Any]]:
   """
   Extract a structured support ticket from freeform text.
 
@@ -39,6 +45,8 @@ def extract_ticket(text: str, *, max_attempts: int = 3) -> Tuple[Dict[str, Any],
       (data, telemetry)
       - data: validated JSON (schema enforced by model)
       - telemetry: response_id, request_id, usage token counts
+        (every attempt is also recorded in the shared telemetry sink, and the
+        tokens it spent in the usage ledger under stage "extractor" and `session`)
   """
   backoff = 1.0
   last_err: Exception | None = None
@@ -51,23 +59,26 @@ def extract_ticket(text: str, *, max_attempts: int = 3) -> Tuple[Dict[str, Any],
 
   for attempt in range(1, max_attempts + 1):
     try:
-      resp = CLIENT.responses.create(
-        model="gpt-4o-mini-2024-07-18",
-        instructions=instructions,
-        input=f"Text:\n{text}",
-        temperature=0.0,
-        max_output_tokens=200,
-        text={
-          "format": {
-            "type": "json_schema",
-            "name": "support_ticket",
-            "schema": EXTRACTION_SCHEMA,
-            "strict": True,
-          }
-        },
-      )
-
-      data = json.loads(resp.output_text)
+      with TELEMETRY.call(MODEL, stage="extract_ticket") as call:
+        resp = call.response = CLIENT.responses.create(
+          model=MODEL,
+          instructions=instructions,
+          input=f"Text:\n{text}",
+          temperature=0.0,
+          max_output_tokens=200,
+          text={
+            "format": {
+              "type": "json_schema",
+              "name": "support_ticket",
+              "schema": EXTRACTION_SCHEMA,
+              "strict": True,
+            }
+          },
+        )
+        # Billed even if the output then fails to parse
+        LEDGER.record_usage(MODEL, resp.usage, stage="extractor", session=session)
+
+        data = json.loads(resp.output_text)
 
       telemetry = {
         "response_id": resp.id,
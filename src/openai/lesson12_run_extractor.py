@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from lesson12_extractor import extract_ticket
+from src.openai.lesson12_extractor import LEDGER, TELEMETRY, extract_ticket
 
 if __name__ == "__main__":
   text = """
@@ -12,3 +12,5 @@ if __name__ == "__main__":
   data, telemetry = extract_ticket(text)
   print(json.dumps(data, indent=2))
   print("\nTelemetry:", json.dumps(telemetry, indent=2))
+  print(TELEMETRY.summary())
+  print(LEDGER.report())
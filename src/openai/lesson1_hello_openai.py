@@ -1,6 +1,8 @@
 from __future__ import annotations
 from openai import OpenAI
 
+from src.observability.ledger import default_ledger
+
 def main() -> None:
     # The SDK reads OPENAI_API_KEY automatically from your environment.
     client = OpenAI()
@@ -17,6 +19,10 @@ def main() -> None:
 
     # 2) Token usage (cost + limits awareness)
     print("\nUSAGE:", resp.usage)
+    # ...and what it cost: the ledger prices tokens per model (and per stage / session)
+    ledger = default_ledger()
+    cost = ledger.record_usage(resp.model, resp.usage, stage="hello")
+    print(f"COST: ${cost:.6f}")
 
     # 3) Debug/trace: request id + response id
     # (request id is useful when contacting support)
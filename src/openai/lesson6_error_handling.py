@@ -12,7 +12,10 @@ from openai import (
   InternalServerError,
 )
 
+from src.observability.telemetry import default_telemetry
+
 client = OpenAI(timeout=30.0, max_retries=0)  # we control retries manually
+telemetry = default_telemetry()
 
 RETRYABLE_ERRORS = (
   RateLimitError,
@@ -32,30 +35,24 @@ def call_llm_with_schema(
 
   for attempt in range(1, max_attempts + 1):
     try:
-      resp = client.responses.create(
-        model=model,
-        input=input_messages,
-        temperature=0.0,
-        text={
-          "format": {
-            "type": "json_schema",
-            "name": "output",
-            "schema": schema,
-            "strict": True,
-          }
-        },
-      )
-
-      print(
-        {
-          "response_id": resp.id,
-          "request_id": getattr(resp, "_request_id", None),
-          "usage": resp.usage,
-        }
-      )
+      # Every attempt is recorded (buffered, no stdout write), failures under their error type
+      with telemetry.call(model) as call:
+        resp = call.response = client.responses.create(
+          model=model,
+          input=input_messages,
+          temperature=0.0,
+          text={
+            "format": {
+              "type": "json_schema",
+              "name": "output",
+              "schema": schema,
+              "strict": True,
+            }
+          },
+        )
 
-      # Parse JSON
-      data = json.loads(resp.output_text)
+        # Parse JSON
+        data = json.loads(resp.output_text)
       return data
 
     except RETRYABLE_ERRORS as e:
@@ -100,4 +97,5 @@ except RuntimeError:
     "feedback": "Sorry — feedback is unavailable right now."
   }
 
-print("Final result:", result)
\ No newline at end of file
+print("Final result:", result)
+print(telemetry.summary())
@@ -12,7 +12,10 @@ from openai import (
   InternalServerError,
 )
 
+from src.observability.telemetry import default_telemetry
+
 client = OpenAI(timeout=30.0, max_retries=0)  # we control retries manually
+telemetry = default_telemetry()
 
 RETRYABLE_ERRORS = (
   RateLimitError,
@@ -35,29 +38,23 @@ def call_llm_with_schema(
 
   for attempt in range(1, max_attempts + 1):
     try:
-      resp = client.responses.create(
-        model=model,
-        input=input_messages,
-        temperature=0.0,
-        text={
-          "format": {
-            "type": "json_schema",
-            "name": "output",
-            "schema": schema,
-            "strict": True,
-          }
-        },
-      )
-
-      print(
-        {
-          "response_id": resp.id,
-          "request_id": getattr(resp, "_request_id", None),
-          "usage": resp.usage,
-        }
-      )
-
-      data = json.loads(resp.output_text)
+      # Every attempt is recorded (buffered, no stdout write), failures under their error type
+      with telemetry.call(model) as call:
+        resp = call.response = client.responses.create(
+          model=model,
+          input=input_messages,
+          temperature=0.0,
+          text={
+            "format": {
+              "type": "json_schema",
+              "name": "output",
+              "schema": schema,
+              "strict": True,
+            }
+          },
+        )
+
+        data = json.loads(resp.output_text)
       return data
 
     except RETRYABLE_ERRORS as e:
@@ -109,3 +106,4 @@ result = call_llm_with_schema(
 )
 
 print("Final result:", result)
+print(telemetry.summary())
@@ -1,5 +1,7 @@
 from openai import OpenAI
 
+from src.observability.ledger import default_ledger
+
 client = OpenAI()
 
 resp = client.responses.create(
@@ -14,3 +16,8 @@ print("Usage:", resp.usage)
 print("Input tokens used:", resp.usage.input_tokens)
 print("Output tokens used:", resp.usage.output_tokens)
 print("Total tokens used:", resp.usage.total_tokens)
+
+ledger = default_ledger()
+ledger.record_usage(resp.model, resp.usage, stage="tokens_limits")
+for (model,), totals in ledger.top_consumers(by="model", metric="tokens"):
+    print(f"{model}: {totals.tokens} tokens, ${totals.cost:.6f}")